@@ -6,8 +6,39 @@ Anomaly:     impossible speed flag
 """
 import math, time
 from collections import defaultdict
+import numpy as np
 from race_config import *
 
+_GRID_MIN_CARS = 32   # below this, brute-force pairs beat the grid overhead
+
+
+class SpatialHashGrid:
+    """Uniform hash grid for car-pair candidates (Teschner et al. prime-XOR hash)."""
+    P1, P2 = 73856093, 19349663
+
+    def __init__(self, cell_size):
+        self.cell  = float(cell_size)
+        self._bins = defaultdict(list)   # reused across frames
+
+    def _key(self, ix, iy):
+        return (self.P1 * ix) ^ (self.P2 * iy)
+
+    def clear(self):
+        self._bins.clear()
+
+    def insert(self, item, x, y):
+        ix = math.floor(x / self.cell); iy = math.floor(y / self.cell)
+        self._bins[self._key(ix, iy)].append(item)
+
+    def query(self, x, y):
+        """Items in the 3×3 cell neighbourhood of (x, y)."""
+        ix = math.floor(x / self.cell); iy = math.floor(y / self.cell)
+        bins = self._bins
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                b = bins.get(self._key(ix+dx, iy+dy))
+                if b: yield from b
+
 
 class CollisionEngine:
     def __init__(self, scoring_engine=None, track=None):
@@ -18,12 +49,15 @@ class CollisionEngine:
         self._speeds   = {}   # car_id -> cm/s
         self._laps     = {}
         self._racing   = {}   # car_id -> bool
-        self._car_cd   = {}   # frozenset pair -> last t
+        self._car_cd   = {}   # (lo << 16 | hi) car pair -> last t
         self._wall_cd  = {}   # car_id -> last t
         self._ghost_t  = {}   # car_id -> time below threshold
         self._spd_buf  = []   # rolling speed samples
         self.events    = []
         self.anomalies = []
+        self._version  = 0    # bumped whenever events change
+        # any pair within collision distance lands in neighbouring cells
+        self._grid     = SpatialHashGrid(2 * CAR_COLLISION_DISTANCE_CM)
 
     # ── setup ──────────────────────────────────────────────
     def register(self, car_id, car_name):
@@ -33,20 +67,22 @@ class CollisionEngine:
     def set_scoring(self, eng):   self.scoring = eng
 
     # ── main update (call every frame) ─────────────────────
-    def update(self, cars: dict, now: float) -> list:
+    def update(self, ids, xs, ys, speeds, laps, racing, now: float) -> list:
         """
-        cars = {car_id: {x, y, speed, lap, racing(bool)}}
+        Parallel per-car arrays, row i describing car ids[i]:
+        xs, ys (cm), speeds (cm/s), laps, racing (bool).
         Returns list of new event dicts this frame.
         """
         new_evts = []
+        ids = list(ids)
 
         # update internal state
-        for cid, d in cars.items():
-            self._pos[cid]    = (d['x'], d['y'], now)
-            self._speeds[cid] = d.get('speed', 0.0)
-            self._laps[cid]   = d.get('lap', 0)
-            self._racing[cid] = d.get('racing', False)
-            spd = self._speeds[cid]
+        for cid, x, y, spd, lap, rc in zip(ids, xs.tolist(), ys.tolist(), speeds.tolist(),
+                                           laps.tolist(), racing.tolist()):
+            self._pos[cid]    = (x, y, now)
+            self._speeds[cid] = spd
+            self._laps[cid]   = lap
+            self._racing[cid] = rc
             if spd > 0:
                 self._spd_buf.append(spd)
                 if len(self._spd_buf) > 300:
@@ -55,33 +91,63 @@ class CollisionEngine:
             if spd > MAX_PLAUSIBLE_SPEED_CM_S:
                 self._flag_anomaly(cid, spd, now)
 
+        ridx = np.flatnonzero(racing)
+
         # car-to-car
-        racing_ids = [c for c, d in cars.items() if d.get('racing', False)]
-        for i in range(len(racing_ids)):
-            for j in range(i+1, len(racing_ids)):
-                e = self._check_car(racing_ids[i], racing_ids[j], now)
+        if len(ridx) > 1:
+            racing_ids = [ids[i] for i in ridx.tolist()]
+            ghosts = {c for c in racing_ids if self._is_ghost(c)}
+            for i, j, dist in self._close_pairs(xs[ridx], ys[ridx]):
+                a, b = racing_ids[i], racing_ids[j]
+                if a in ghosts or b in ghosts: continue
+                e = self._check_car(a, b, dist, now)
                 if e: new_evts.append(e)
 
         # wall
-        for cid, d in cars.items():
-            if not d.get('racing', False): continue
-            e = self._check_wall(cid, d['x'], d['y'], d.get('lap',0), now)
+        for i in ridx.tolist():
+            e = self._check_wall(ids[i], float(xs[i]), float(ys[i]), int(laps[i]), now)
             if e: new_evts.append(e)
 
-        self.events.extend(new_evts)
+        if new_evts:
+            self.events.extend(new_evts)
+            self._version += 1
         return new_evts
 
     # ── car-to-car ─────────────────────────────────────────
-    def _check_car(self, a, b, now):
-        if self._is_ghost(a) or self._is_ghost(b):
-            return None
-        pa = self._pos.get(a); pb = self._pos.get(b)
-        if not pa or not pb: return None
+    def _candidate_pairs(self, xs, ys):
+        """Grid-neighbour index pairs (i<j) that may be within collision distance."""
+        grid = self._grid
+        grid.clear()
+        pts = list(zip(xs.tolist(), ys.tolist()))
+        for i, (x, y) in enumerate(pts):
+            grid.insert(i, x, y)
+        pairs = set()
+        for i, (x, y) in enumerate(pts):
+            for j in grid.query(x, y):
+                if j > i: pairs.add((i, j))
+        return sorted(pairs)
 
-        dist = math.hypot(pa[0]-pb[0], pa[1]-pb[1])
-        if dist > CAR_COLLISION_DISTANCE_CM: return None
+    def _close_pairs(self, xs, ys):
+        """(i, j, dist) for pairs within CAR_COLLISION_DISTANCE_CM, vectorised."""
+        pos = np.column_stack((xs, ys)).astype(np.float32, copy=False)
+        thr2 = np.float32(CAR_COLLISION_DISTANCE_CM * CAR_COLLISION_DISTANCE_CM)
+        if len(pos) < _GRID_MIN_CARS:
+            diff = pos[:, None, :] - pos[None, :, :]
+            d2   = np.einsum('ijk,ijk->ij', diff, diff)
+            I, J = np.nonzero(np.triu(d2 <= thr2, k=1))
+            d2   = d2[I, J]
+        else:
+            cand = self._candidate_pairs(xs, ys)
+            if not cand: return []
+            I, J = np.array(cand, dtype=np.intp).T
+            diff = pos[I] - pos[J]
+            d2   = np.einsum('ij,ij->i', diff, diff)
+            keep = d2 <= thr2
+            I, J, d2 = I[keep], J[keep], d2[keep]
+        return zip(I.tolist(), J.tolist(), np.sqrt(d2).tolist())
 
-        key = frozenset([a, b])
+    def _check_car(self, a, b, dist, now):
+        key = (a << 16 | b) if a < b else (b << 16 | a)   # unordered pair, small ids
         if now - self._car_cd.get(key, 0) < CAR_COLLISION_COOLDOWN: return None
         self._car_cd[key] = now
 
@@ -92,8 +158,8 @@ class CollisionEngine:
         else:
             attacker, victim = a, b
 
-        an = self._names.get(attacker, f"Car{attacker}")
-        vn = self._names.get(victim,   f"Car{victim}")
+        an = self._names.get(attacker) or f"Car{attacker}"
+        vn = self._names.get(victim) or f"Car{victim}"
         lap = self._laps.get(attacker, 0)
 
         if self.scoring:
@@ -120,7 +186,7 @@ class CollisionEngine:
         if not wall: return None
 
         self._wall_cd[cid] = now
-        name = self._names.get(cid, f"Car{cid}")
+        name = self._names.get(cid) or f"Car{cid}"
 
         if self.scoring:
             self.scoring.wall_hit(cid)
@@ -147,7 +213,7 @@ class CollisionEngine:
 
     # ── anomaly ────────────────────────────────────────────
     def _flag_anomaly(self, cid, spd, now):
-        name = self._names.get(cid, f"Car{cid}")
+        name = self._names.get(cid) or f"Car{cid}"
         rec  = dict(car_id=cid, name=name, speed=spd, time=now)
         self.anomalies.append(rec)
         if PRINT_ANOMALIES:
@@ -157,19 +223,24 @@ class CollisionEngine:
     @staticmethod
     def _dist_boundary(px, py, pts):
         if not pts or len(pts) < 2: return float('inf')
+        # compare squared distances, one sqrt for the winner
         best = float('inf')
         for i in range(len(pts)):
             x1,y1=pts[i]; x2,y2=pts[(i+1)%len(pts)]
             dx,dy=x2-x1,y2-y1; denom=dx*dx+dy*dy
             if denom == 0:
-                d=math.hypot(px-x1,py-y1)
+                ex,ey=px-x1,py-y1
             else:
                 t=max(0,min(1,((px-x1)*dx+(py-y1)*dy)/denom))
-                d=math.hypot(px-x1-t*dx, py-y1-t*dy)
-            best=min(best,d)
-        return best
+                ex,ey=px-x1-t*dx, py-y1-t*dy
+            d2=ex*ex+ey*ey
+            if d2 < best: best=d2
+        return math.sqrt(best)
 
     # ── queries ────────────────────────────────────────────
+    def version(self):
+        return self._version
+
     def wall_hits(self, cid):
         return [e for e in self.events if e['type']=='wall' and e['car_id']==cid]
 
@@ -181,4 +252,5 @@ class CollisionEngine:
         self.events.clear(); self.anomalies.clear()
         self._car_cd.clear(); self._wall_cd.clear(); self._ghost_t.clear()
         self._spd_buf.clear()
+        self._version += 1
         print("✓ Collision engine reset")
@@ -3,8 +3,23 @@ Lap Engine
 Tracks start/finish crossings, cooldown, checkpoint validation, pit-zone speed.
 Integrates with ScoringEngine to open/close LapScore objects.
 """
-import time, math
+import time
+import numpy as np
 from race_config import *
+from jit_support import njit
+
+_CHECKPOINTS_XY = np.array(CHECKPOINTS, dtype=np.float64).reshape(-1, 2)
+
+
+@njit(cache=True)
+def _mark_checkpoints(x, y, cps, radius, hit):
+    """Flag every not-yet-hit checkpoint within radius of (x, y)."""
+    r2 = radius * radius
+    for i in range(cps.shape[0]):
+        if not hit[i]:
+            dx = x - cps[i, 0]; dy = y - cps[i, 1]
+            if dx*dx + dy*dy <= r2:
+                hit[i] = True
 
 
 class LapEngine:
@@ -24,12 +39,9 @@ class LapEngine:
         self._side             = None   # which side of line car is on
         self._lap_start        = None
         self._last_cross       = 0.0    # epoch of last valid crossing
-        self._checkpoints_hit  = set()  # which checkpoints passed this lap
+        self._checkpoints_hit  = np.zeros(len(_CHECKPOINTS_XY), dtype=np.bool_)  # passed this lap
         self._lap_times        = []     # raw lap times
 
-        # for checkpoint tracking
-        self._all_checkpoints  = list(range(len(CHECKPOINTS)))
-
     # ── admin control ───────────────────────────────────────
     def arm(self):
         """Admin hits Start – enable lap activation."""
@@ -84,7 +96,7 @@ class LapEngine:
             self.is_racing   = True
             self.current_lap = 1
             self._lap_start  = now
-            self._checkpoints_hit.clear()
+            self._checkpoints_hit[:] = False
             self.scoring.open_lap(self.car_id, self.current_lap)
             if PRINT_LAP_EVENTS:
                 print(f"🏁 START | {self.car_name} – Lap 1/{TOTAL_LAPS}")
@@ -116,7 +128,7 @@ class LapEngine:
         # Next lap
         self.current_lap += 1
         self._lap_start   = now
-        self._checkpoints_hit.clear()
+        self._checkpoints_hit[:] = False
         self.scoring.open_lap(self.car_id, self.current_lap)
         if PRINT_LAP_EVENTS:
             print(f"🔄 LAP  | {self.car_name} – Lap {self.current_lap}/{TOTAL_LAPS}  raw={raw:.2f}s  ELP={lap_score.elp:.2f}s")
@@ -134,15 +146,13 @@ class LapEngine:
         return START_LINE_X - LINE_CROSSING_THRESHOLD <= x <= START_LINE_X + LINE_CROSSING_THRESHOLD
 
     def _check_checkpoints(self, x, y):
-        for idx, (cx, cy) in enumerate(CHECKPOINTS):
-            if idx in self._checkpoints_hit: continue
-            if math.hypot(x-cx, y-cy) <= CHECKPOINT_RADIUS:
-                self._checkpoints_hit.add(idx)
+        if len(_CHECKPOINTS_XY):
+            _mark_checkpoints(float(x), float(y), _CHECKPOINTS_XY,
+                              float(CHECKPOINT_RADIUS), self._checkpoints_hit)
 
     def _validate_checkpoints(self):
-        for idx in self._all_checkpoints:
-            if idx not in self._checkpoints_hit:
-                self.scoring.corner_cut(self.car_id)
+        for _ in range(int((~self._checkpoints_hit).sum())):
+            self.scoring.corner_cut(self.car_id)
 
     def _check_pit_speed(self, x, y, speed):
         if self.current_lap == 1:
@@ -172,7 +182,7 @@ class LapEngine:
         self.current_lap=0; self.total_laps_done=0
         self.is_racing=False; self.race_finished=False; self.admin_armed=False
         self._side=None; self._lap_start=None; self._last_cross=0.0
-        self._checkpoints_hit.clear(); self._lap_times.clear()
+        self._checkpoints_hit[:] = False; self._lap_times.clear()
         print(f"🔄 {self.car_name} lap engine reset")
 
 
@@ -186,6 +196,7 @@ class RaceManager:
         self.race_start_time = None
         self.race_end_time   = None
         self._admin_armed    = False
+        self._version        = 0      # bumped on every race-state change
 
     def register_car(self, car_id, car_name):
         self.scoring.register(car_id, car_name)
@@ -197,6 +208,7 @@ class RaceManager:
         self._admin_armed = True
         for eng in self._engines.values():
             eng.arm()
+        self._version += 1
         print("🟢 RACE ARMED – waiting for first line crossings")
 
     def update_car(self, car_id, x, y, speed, now) -> dict | None:
@@ -204,6 +216,7 @@ class RaceManager:
         if not eng: return None
         event = eng.update(x, y, speed, now)
         if event:
+            self._version += 1
             if event['type'] == 'race_start' and not self.race_active:
                 self.race_active     = True
                 self.race_start_time = now
@@ -215,8 +228,20 @@ class RaceManager:
                     print(f"🏆 ALL FINISHED – {now-self.race_start_time:.2f}s total")
         return event
 
+    def update_all(self, car_ids, positions, speeds, now) -> list:
+        """Batch update_car over row-aligned ids / (N,2) positions / speeds; returns events."""
+        events = []
+        for cid, (x, y), spd in zip(car_ids, positions.tolist(), speeds.tolist()):
+            event = self.update_car(cid, x, y, spd, now)
+            if event: events.append(event)
+        return events
+
     def is_race_active(self): return self.race_active
 
+    def state_version(self):
+        """Counter that changes whenever laps, arming or race state change."""
+        return self._version
+
     def get_car_info(self, car_id, now=None):
         eng = self._engines.get(car_id)
         return eng.get_info(now) if eng else None
@@ -250,4 +275,5 @@ class RaceManager:
         self.scoring.reset()
         self.race_active=False; self.race_start_time=None; self.race_end_time=None
         self._admin_armed=False
+        self._version += 1
         print("🔄 Race reset – ready")
@@ -14,6 +14,7 @@ Controls (type in console + Enter):
 """
 
 import time, math, threading
+import numpy as np
 from config         import *
 from race_config    import *
 from uwb_device     import Anchor, Tag
@@ -48,6 +49,10 @@ class RacingTrackerMatplotlib:
             print(f"  {a.name}: ({a.x}, {a.y}) cm")
         print()
 
+        # per-frame collision inputs (row i = i-th active tag)
+        self._laps   = np.zeros(len(self.tags), dtype=np.int32)
+        self._racing = np.zeros(len(self.tags), dtype=bool)
+
         # ── Engines ──────────────────────────────────────────
         self.scoring   = ScoringEngine()
         self.race_mgr  = RaceManager(self.scoring)
@@ -77,10 +82,11 @@ class RacingTrackerMatplotlib:
         # ── App state ────────────────────────────────────────
         self.running      = True
         self.show_debug   = False
-        self.last_refresh = time.time()
+        self.last_refresh = time.perf_counter()
 
         # ── Logging ──────────────────────────────────────────
         self.log_file = None
+        self._last_flush = time.perf_counter()
         if ENABLE_RACE_LOGGING:
             self._init_log()
 
@@ -97,12 +103,12 @@ class RacingTrackerMatplotlib:
     def _calc_scale(self):
         uw = SCREEN_X * 0.65
         uh = SCREEN_Y * 0.85
-        tw = max(a.x for a in self.anchors) - min(a.x for a in self.anchors)
-        th = max(a.y for a in self.anchors) - min(a.y for a in self.anchors)
+        xy = np.array([(a.x, a.y) for a in self.anchors], dtype=np.float64)
+        tw, th = (xy.max(axis=0) - xy.min(axis=0)).tolist()
         cm2p = min(uw/tw if tw else 1, uh/th if th else 1)
         xoff = (uw - tw*cm2p)/2 + 50
         yoff = (uh - th*cm2p)/2 + 50
-        print(f"Display: {cm2p:.3f} px/cm  track {tw}×{th}cm")
+        print(f"Display: {cm2p:.3f} px/cm  track {tw:g}×{th:g}cm")
         return dict(cm2p=cm2p, x_offset=xoff, y_offset=yoff)
 
     # ─────────────────────────────────────────────────────────
@@ -110,7 +116,7 @@ class RacingTrackerMatplotlib:
     # ─────────────────────────────────────────────────────────
     def _init_log(self):
         try:
-            self.log_file = open(RACE_LOG_FILE, 'w')
+            self.log_file = open(RACE_LOG_FILE, 'w', buffering=65536)
             self.log_file.write("ts,car_id,car_name,event,lap,value,detail\n")
             print(f"📋 Logging → {RACE_LOG_FILE}")
         except Exception as e:
@@ -121,9 +127,15 @@ class RacingTrackerMatplotlib:
         try:
             name = self.tags[car_id].name if car_id < len(self.tags) else f"Car{car_id}"
             self.log_file.write(f"{time.time():.3f},{car_id},{name},{event},{lap},{value},{detail}\n")
-            self.log_file.flush()
         except Exception: pass
 
+    def _flush_log(self, now):
+        # batched: at most once per LOG_FLUSH_INTERVAL instead of per event
+        if not self.log_file or now - self._last_flush < LOG_FLUSH_INTERVAL: return
+        try: self.log_file.flush()
+        except Exception: pass
+        self._last_flush = now
+
     # ─────────────────────────────────────────────────────────
     # Command loop
     # ─────────────────────────────────────────────────────────
@@ -162,43 +174,37 @@ class RacingTrackerMatplotlib:
     def update(self):
         now = time.time()
 
-        cars_data = {}
-        for tag in self.tags:
-            if not (tag.status and tag.is_active(TAG_TIMEOUT)):
-                continue
-
-            # Speed
-            spd_info = self.spd_mgr.update_car_speed(tag.id, tag.x, tag.y, now)
-            spd_cms  = spd_info.get('instantaneous_cms', 0) if spd_info else 0
-
-            # Lap engine
-            event = self.race_mgr.update_car(tag.id, tag.x, tag.y, spd_cms, now)
-            if event:
-                self._log(tag.id, event['type'], event.get('lap',0),
-                          f"{event.get('raw_time',0):.3f}",
-                          f"elp={event.get('elp',0):.3f}")
-
-            lap_info = self.race_mgr.get_car_info(tag.id, now)
-            is_racing = lap_info['is_racing'] if lap_info else False
-
-            cars_data[tag.id] = dict(
-                x=tag.x, y=tag.y,
-                speed=spd_cms,
-                lap=lap_info['current_lap'] if lap_info else 0,
-                racing=is_racing
-            )
+        active = [t for t in self.tags if t.status and t.is_active(TAG_TIMEOUT)]
+        if not active: return
+        ids = [t.id for t in active]
+        pos = np.array([(t.x, t.y) for t in active], dtype=np.float64)
+
+        # Speed + lap engine, one batched call each
+        speeds = self.spd_mgr.update_all(ids, pos, now)
+        for event in self.race_mgr.update_all(ids, pos, speeds, now):
+            self._log(event['car_id'], event['type'], event.get('lap',0),
+                      f"{event.get('raw_time',0):.3f}",
+                      f"elp={event.get('elp',0):.3f}")
+
+        # per-car lap state in preallocated parallel arrays
+        n = len(ids)
+        laps, racing = self._laps[:n], self._racing[:n]
+        for i, cid in enumerate(ids):
+            lap_info = self.race_mgr.get_car_info(cid, now)
+            laps[i]   = lap_info['current_lap'] if lap_info else 0
+            racing[i] = lap_info['is_racing'] if lap_info else False
 
         # Collision engine
-        if cars_data:
-            new_evts = self.col_engine.update(cars_data, now)
-            for e in new_evts:
-                if e['type'] == 'wall':
-                    self._log(e['car_id'], 'wall_hit', e['lap'])
-                elif e['type'] == 'car':
-                    self._log(e['attacker'], 'car_atk', e['lap'],
-                              detail=f"victim={e['victim']}")
-                    self._log(e['victim'],   'car_vic', e['lap'],
-                              detail=f"attacker={e['attacker']}")
+        new_evts = self.col_engine.update(ids, pos[:, 0], pos[:, 1], speeds,
+                                          laps, racing, now)
+        for e in new_evts:
+            if e['type'] == 'wall':
+                self._log(e['car_id'], 'wall_hit', e['lap'])
+            elif e['type'] == 'car':
+                self._log(e['attacker'], 'car_atk', e['lap'],
+                          detail=f"victim={e['victim']}")
+                self._log(e['victim'],   'car_vic', e['lap'],
+                          detail=f"attacker={e['attacker']}")
 
     # ─────────────────────────────────────────────────────────
     # Console print helpers
@@ -269,19 +275,42 @@ class RacingTrackerMatplotlib:
     # ─────────────────────────────────────────────────────────
     def run(self):
         print("🏁 Tracker running. Type 'start' to begin race.\n")
+        # fixed-step race updates, rendering decoupled at REFRESH_RATE;
+        # perf_counter only schedules – race timestamps stay on time.time()
+        accum = 0.0
+        last  = time.perf_counter()
         try:
             while self.running:
-                self.update()
-                if time.time() - self.last_refresh > REFRESH_RATE:
+                now = time.perf_counter()
+                accum += now - last
+                last = now
+
+                steps = 0
+                while accum >= SIM_DT and steps < SIM_MAX_STEPS:
+                    self.update()
+                    accum -= SIM_DT
+                    steps += 1
+                if steps == SIM_MAX_STEPS:
+                    accum = 0.0   # fell behind (e.g. window drag) – drop the backlog
+
+                self._flush_log(now)
+
+                if now - self.last_refresh >= REFRESH_RATE:
                     self.renderer.render_frame(
                         self.anchors, self.tags,
                         self.race_mgr, self.spd_mgr,
                         self.col_engine,
                         show_debug=self.show_debug,
-                        track=self.track
+                        track=self.track,
+                        now=time.time()
                     )
-                    self.last_refresh = time.time()
-                time.sleep(0.01)
+                    self.last_refresh = now
+
+                # sleep until the next sim step or frame is due
+                wait = min(SIM_DT - accum,
+                           REFRESH_RATE - (time.perf_counter() - self.last_refresh))
+                if wait > 0:
+                    time.sleep(wait)
         except KeyboardInterrupt:
             print("\n⚠️  Interrupted")
         finally:
@@ -4,11 +4,55 @@ Shows: wide track, ELP leaderboard, incident feed, tags with speed/lap info
 """
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.collections import EllipseCollection, LineCollection
+from matplotlib.transforms import Bbox
 import numpy as np
 import time, math
 from race_config import *
+from jit_support import njit, NUMBA_AVAILABLE
 
 TAG_COLORS = ['#00BFFF', '#FF4500', '#32CD32', '#FFD700', '#FF69B4']
+_NO_COLLISIONS = (float('-inf'), 0)   # (last car-hit time, wall hits)
+
+# leaderboard formatting, parsed once
+_LB_ROW  = "{:<4}{:<8}{:>9}{:>6}{:>6}".format
+_LB_QLFY = "({}/{})".format
+_LB_HEAD = ("═══ BEST-ELP LEADERBOARD ═══",
+            _LB_ROW('Pos', 'Car', 'BestELP', 'Laps', 'Qlfy'),
+            "─"*38)
+
+# label offsets from a tag/anchor centre, pre-added once
+_TAG_LABEL_DX = TAG_RADIUS + 4
+_ANCHOR_LABEL_OFS = (8, -8)
+
+# text box styles (Text copies these, so sharing is safe)
+_START_BBOX  = dict(boxstyle='round,pad=0.2', facecolor='black', alpha=0.7)
+_TAG_BBOX    = dict(boxstyle='round,pad=0.2', facecolor='#1a1a2e', alpha=0.7)
+_LB_BBOX     = dict(boxstyle='round,pad=0.5', facecolor='#111130', edgecolor='#4444aa', lw=1.5)
+_FEED_BBOX   = dict(boxstyle='round,pad=0.5', facecolor='#200000', edgecolor='#880000', lw=1)
+
+# force a full redraw + background re-snapshot every N blitted frames
+_FULL_REFRESH_FRAMES = 300
+
+
+def _closed_loop(pts):
+    """(xs, ys) tuples with the first point repeated at the end, or None."""
+    if not pts:
+        return None
+    xs, ys = zip(*pts)
+    return xs + xs[:1], ys + ys[:1]
+
+
+@njit(cache=True)
+def _transform_and_cull(xs, ys, n, cm2p, ox, oy, sh, x0, y0, x1, y1,
+                        out_px, out_py, out_vis):
+    """cm -> px for the first n tags, flagging those inside the view bounds."""
+    for i in range(n):
+        px = xs[i] * cm2p + ox
+        py = sh - (ys[i] * cm2p + oy)
+        out_px[i] = px
+        out_py[i] = py
+        out_vis[i] = x0 <= px <= x1 and y0 <= py <= y1
 
 
 class MatplotlibRenderer:
@@ -16,10 +60,18 @@ class MatplotlibRenderer:
         self.cm2p     = scale_params['cm2p']
         self.x_offset = scale_params['x_offset']
         self.y_offset = scale_params['y_offset']
+        # cm -> px as one affine map: px = xy * _a + _b  (y axis flipped)
+        self._a = np.array([self.cm2p, -self.cm2p], dtype=np.float32)
+        self._b = np.array([self.x_offset, SCREEN_Y - self.y_offset], dtype=np.float32)
 
-        self.fig, self.ax = plt.subplots(figsize=(14, 9))
+        # no navigation toolbar: it would handle every mouse-motion event
+        with plt.rc_context({'toolbar': 'None'}):
+            self.fig, self.ax = plt.subplots(figsize=(14, 9))
         try:
             self.fig.canvas.manager.set_window_title('UWB Racing Tracker')
+            # default key bindings (s=save, l=log scale, …) clash with a live view;
+            # commands come from the console
+            self.fig.canvas.mpl_disconnect(self.fig.canvas.manager.key_press_handler_id)
         except Exception:
             pass
         self.ax.set_xlim(0, SCREEN_X)
@@ -33,26 +85,116 @@ class MatplotlibRenderer:
         plt.tight_layout(pad=0.5)
         plt.show(block=False)
 
+        # signature of the last composed frame (skip redraw when unchanged)
+        self._last_frame_sig = None
+        self._grid_segs = None
+        # (track, pixel geometry) – boundaries are static, convert them once
+        self._track_px = None
+        # SoA position buffers for active tags, filled each frame
+        self._xs = np.empty(MAX_CARS, np.float32)
+        self._ys = np.empty(MAX_CARS, np.float32)
+        self._tag_refs = [None] * MAX_CARS
+        self._alloc_px_buffers(MAX_CARS)
+        # visible area (+50px margin so labels of near-edge tags survive)
+        self._view_bounds = (-50, -50, SCREEN_X + 50, SCREEN_Y + 50)
+        # key -> (tenths, text): elapsed-time strings re-formatted at 10 Hz only
+        self._time_txt = {}
+        # slot -> (args, text): label lines re-formatted only when their inputs change
+        self._labels = {}
+        # car_id -> (last car-hit time, wall hits), valid for one frame
+        self._collision_cache = None
+        # (RaceManager.state_version(), formatted ELP rows)
+        self._elp_rows_cache = (None, [])
+
+        # blitting: static layer (grid/track/start line/anchors) is drawn once and
+        # snapshotted; each frame only the dynamic artists are redrawn over it
+        canvas = self.fig.canvas
+        self._blit = bool(getattr(canvas, 'supports_blit', False))
+        self._bg = None
+        self._static_key = None
+        self._dyn = []
+        self._dots = None   # persistent tag-dot collection
+        self._keep = []     # persistent dynamic artists (hidden when unused)
+        self._frames_since_full = 0
+        self._prev_dirty = []   # display-space extents blitted last frame
+        if self._blit:
+            canvas.mpl_connect('draw_event', self._on_draw)
+            # we present frames ourselves; pyplot's auto draw_idle on stale would
+            # repaint the background without the (animated) dynamic layer
+            self.fig.stale_callback = None
+
+    def _alloc_px_buffers(self, size):
+        # outputs of the compiled transform/cull kernel
+        self._pxs = np.empty(size, np.float32)
+        self._pys = np.empty(size, np.float32)
+        self._vis = np.empty(size, np.bool_)
+
     # ── coordinate conversion ───────────────────────────────
     def cm2px(self, x, y):
         px = x * self.cm2p + self.x_offset
         py = SCREEN_Y - (y * self.cm2p + self.y_offset)
         return px, py
 
+    def cm2px_array(self, xy):
+        """(N,2+) cm samples -> (N,2) float32 pixel coords in one pass."""
+        xy = np.asarray(xy, dtype=np.float32)
+        return xy[:, :2] * self._a + self._b
+
+    # ── elapsed-time text (quantised to 0.1s) ───────────────
+    def _timed_text(self, key, seconds, fmt, *args):
+        tenths = round(seconds * 10)
+        hit = self._time_txt.get(key)
+        if hit is not None and hit[0] == tenths:
+            return hit[1]
+        txt = fmt.format(*args, tenths / 10)
+        self._time_txt[key] = (tenths, txt)
+        return txt
+
+    # ── cached label lines ──────────────────────────────────
+    def _label(self, slot, fmt, *args):
+        hit = self._labels.get(slot)
+        if hit is not None and hit[0] == args:
+            return hit[1]
+        txt = fmt.format(*args)
+        self._labels[slot] = (args, txt)
+        return txt
+
     # ── grid ────────────────────────────────────────────────
-    def draw_grid(self):
+    def _grid_segments(self):
         gs = GRID_SPACING_CM * self.cm2p
-        for x in np.arange(0, SCREEN_X, gs):
-            self.ax.axvline(x, color='#2a2a4a', linewidth=0.5)
-        for y in np.arange(0, SCREEN_Y, gs):
-            self.ax.axhline(y, color='#2a2a4a', linewidth=0.5)
+        segs = [((x, 0), (x, SCREEN_Y)) for x in np.arange(0, SCREEN_X, gs)]
+        segs += [((0, y), (SCREEN_X, y)) for y in np.arange(0, SCREEN_Y, gs)]
+        return segs
+
+    def draw_grid(self):
+        # one collection over segments built once (scale never changes at runtime)
+        if self._grid_segs is None:
+            self._grid_segs = self._grid_segments()
+        self.ax.add_collection(LineCollection(self._grid_segs,
+            colors='#2a2a4a', linewidths=0.5, zorder=2))
 
     # ── track ───────────────────────────────────────────────
-    def draw_track(self, track):
-        if not track: return
+    def _track_pixels(self, track):
+        """Track boundaries converted to pixel space once per track."""
+        cached = self._track_px
+        if cached is not None and cached[0] is track:
+            return cached[1]
         if track.has_width():
             op = [self.cm2px(x,y) for x,y in track.get_outer_points()]
             ip = [self.cm2px(x,y) for x,y in track.get_inner_points()]
+            cl = ([((op[i][0]+ip[i][0])/2,(op[i][1]+ip[i][1])/2) for i in range(len(op))]
+                  if len(op)==len(ip) else None)
+            # closed (xs, ys) loops for the wall / racing-line plots
+            geom = (op, ip, cl, _closed_loop(op), _closed_loop(ip), _closed_loop(cl))
+        else:
+            geom = [self.cm2px(x,y) for x,y in track.get_points()]
+        self._track_px = (track, geom)
+        return geom
+
+    def draw_track(self, track):
+        if not track: return
+        if track.has_width():
+            op, ip, cl, op_loop, ip_loop, cl_loop = self._track_pixels(track)
 
             # Infield grass
             if ip:
@@ -64,32 +206,19 @@ class MatplotlibRenderer:
                 self.ax.add_patch(patches.Polygon(op+ip[::-1], closed=True,
                     facecolor='#2a2a2a', alpha=0.95, edgecolor='none', zorder=2))
 
-            # Outer wall (red + white dashes)
-            if op:
-                xs,ys = zip(*op)
-                self.ax.plot(list(xs)+[xs[0]], list(ys)+[ys[0]],
-                    color='#CC0000', lw=5, zorder=4)
-                self.ax.plot(list(xs)+[xs[0]], list(ys)+[ys[0]],
-                    color='white', lw=2, ls='--', dashes=(12,8), zorder=5)
-
-            # Inner wall (red + white dashes)
-            if ip:
-                xs,ys = zip(*ip)
-                self.ax.plot(list(xs)+[xs[0]], list(ys)+[ys[0]],
-                    color='#CC0000', lw=5, zorder=4)
-                self.ax.plot(list(xs)+[xs[0]], list(ys)+[ys[0]],
-                    color='white', lw=2, ls='--', dashes=(12,8), zorder=5)
+            # Outer / inner walls (red + white dashes)
+            for loop in (op_loop, ip_loop):
+                if loop:
+                    self.ax.plot(*loop, color='#CC0000', lw=5, zorder=4)
+                    self.ax.plot(*loop, color='white', lw=2, ls='--', dashes=(12,8), zorder=5)
 
             # Yellow racing line
-            if len(op)==len(ip):
-                cl = [((op[i][0]+ip[i][0])/2,(op[i][1]+ip[i][1])/2) for i in range(len(op))]
-                xs,ys = zip(*cl)
-                self.ax.plot(list(xs)+[xs[0]], list(ys)+[ys[0]],
+            if cl_loop:
+                self.ax.plot(*cl_loop,
                     color='#FFD700', lw=1.5, ls='--', dashes=(18,10), alpha=0.6, zorder=3)
         else:
-            pts = track.get_points()
-            if len(pts) < 3: return
-            pp = [self.cm2px(x,y) for x,y in pts]
+            pp = self._track_pixels(track)
+            if len(pp) < 3: return
             self.ax.add_patch(patches.Polygon(pp, closed=True,
                 facecolor='#2a2a2a', alpha=0.9, edgecolor='white', lw=3, zorder=2))
 
@@ -102,78 +231,160 @@ class MatplotlibRenderer:
         sq = 18
         n  = max(1, int(abs(y2-y1)/sq))
         ylo, yhi = min(y1,y2), max(y1,y2)
+        segs, cols = [], []
         for i in range(n):
             ys = ylo + i*sq; ye = min(ys+sq, yhi)
-            c  = 'black' if i%2==0 else 'white'
-            self.ax.plot([x1,x1],[ys,ye], color=c, lw=9, solid_capstyle='butt', zorder=10)
-        self.ax.plot([x1,x1],[ylo,yhi], color='#00FF00', lw=2, zorder=11)
+            segs.append(((x1,ys), (x1,ye)))
+            cols.append('black' if i%2==0 else 'white')
+        self.ax.add_collection(LineCollection(segs, colors=cols, linewidths=9,
+            capstyle='butt', zorder=10))
+        self.ax.plot((x1,x1),(ylo,yhi), color='#00FF00', lw=2, zorder=11)
         self.ax.text(x1+12, ylo-10, 'START/FINISH',
             fontsize=9, color='#00FF00', fontweight='bold',
-            bbox=dict(boxstyle='round,pad=0.2', facecolor='black', alpha=0.7), zorder=12)
+            bbox=_START_BBOX, zorder=12)
 
     # ── anchors ─────────────────────────────────────────────
     def draw_anchors(self, anchors):
+        dx, dy = _ANCHOR_LABEL_OFS
         for a in anchors:
             px,py = self.cm2px(a.x, a.y)
             self.ax.plot(px, py, 'o', ms=10, color='white', zorder=8)
-            self.ax.text(px+8, py-8, f"{a.name}\n({int(a.x)},{int(a.y)})",
+            self.ax.text(px+dx, py+dy,
+                self._label(('anchor', a.name), "{}\n({},{})", a.name, int(a.x), int(a.y)),
                 fontsize=7, color='#aaaaaa', zorder=8)
 
+    # ── per-frame collision index ───────────────────────────
+    def _index_collisions(self, collision_engine):
+        """One pass over the event log: car_id -> (last car-hit time, wall hits)."""
+        cache = {}
+        if not collision_engine:
+            return cache
+        for e in collision_engine.events:
+            if e['type'] == 'car':
+                for cid in (e['attacker'], e['victim']):
+                    last, wh = cache.get(cid, _NO_COLLISIONS)
+                    cache[cid] = (max(last, e['time']), wh)
+            elif e['type'] == 'wall':
+                last, wh = cache.get(e['car_id'], _NO_COLLISIONS)
+                cache[e['car_id']] = (last, wh + 1)
+        return cache
+
     # ── tags ────────────────────────────────────────────────
-    def draw_tags(self, tags, race_manager, speed_manager, collision_engine, now):
-        for tag in tags:
-            if not (tag.status and tag.is_active(TAG_TIMEOUT)):
+    def draw_tags(self, tags, race_manager, speed_manager, collision_engine, now,
+                  active=None):
+        if active is None:
+            active = self._active_flags(tags, now)
+        # gather active tags into the SoA position buffers
+        if len(tags) > len(self._xs):
+            self._xs = np.empty(len(tags), np.float32)
+            self._ys = np.empty(len(tags), np.float32)
+            self._tag_refs = [None] * len(tags)
+            self._alloc_px_buffers(len(tags))
+        xs, ys, refs = self._xs, self._ys, self._tag_refs
+        n = 0
+        for tag, on in zip(tags, active):
+            if not on:
                 continue
-            px, py = self.cm2px(tag.x, tag.y)
+            xs[n] = tag.x; ys[n] = tag.y; refs[n] = tag
+            n += 1
+        if not n: return
+
+        # batched cm->px transform + off-screen cull (skips trail, overlays, labels)
+        x0, y0, x1, y1 = self._view_bounds
+        if NUMBA_AVAILABLE:
+            _transform_and_cull(xs, ys, n, self.cm2p, self.x_offset, self.y_offset,
+                                SCREEN_Y, x0, y0, x1, y1,
+                                self._pxs, self._pys, self._vis)
+            pxs, pys, visible = self._pxs[:n], self._pys[:n], self._vis[:n]
+        else:
+            pxs = xs[:n] * self.cm2p + self.x_offset
+            pys = SCREEN_Y - (ys[:n] * self.cm2p + self.y_offset)
+            visible = (pxs >= x0) & (pxs <= x1) & (pys >= y0) & (pys <= y1)
+
+        idx = np.flatnonzero(visible)
+        if not len(idx): return
+        dot_colors, flash_xy = [], []
+        trails, trail_colors = [], []
+
+        for i in idx:
+            tag    = refs[i]
+            px, py = float(pxs[i]), float(pys[i])
             color  = TAG_COLORS[tag.id % len(TAG_COLORS)]
 
-            # trail
+            # trail (batched below)
             if len(tag.history) >= 2:
-                hx = [self.cm2px(h[0],h[1])[0] for h in tag.history]
-                hy = [self.cm2px(h[0],h[1])[1] for h in tag.history]
-                self.ax.plot(hx, hy, '-', color=color, lw=1.5, alpha=0.4, zorder=6)
+                trails.append(self.cm2px_array(tag.history))
+                trail_colors.append(color)
 
-            # dot
-            self.ax.add_patch(plt.Circle((px,py), TAG_RADIUS,
-                color=color, zorder=10))
+            # dot (batched below)
+            dot_colors.append(color)
 
-            # collision flash
-            ce = collision_engine.car_events(tag.id) if collision_engine else []
-            recent = [e for e in ce if now-e['time'] < 0.8]
-            if recent:
-                self.ax.add_patch(plt.Circle((px,py), COLLISION_INDICATOR_RADIUS,
-                    fill=False, edgecolor='red', lw=3, zorder=11))
+            # collision flash (batched below)
+            last_hit, wh = self._collision_cache.get(tag.id, _NO_COLLISIONS)
+            if now - last_hit < 0.8:
+                flash_xy.append((px, py))
 
             # label
             lap_info   = race_manager.get_car_info(tag.id, now)
             speed_info = speed_manager.get_car_speed_info(tag.id) if speed_manager else None
             score_sum  = race_manager.scoring.get_car_summary(tag.id)
 
-            lines = [f"{tag.name} ({int(tag.x)},{int(tag.y)})"]
+            lines = [self._label(('pos', tag.id), "{} ({},{})",
+                                 tag.name, int(tag.x), int(tag.y))]
             if lap_info:
                 if lap_info['is_racing']:
-                    elapsed = lap_info['current_lap_elapsed']
-                    lines.append(f"Lap {lap_info['current_lap']}/{TOTAL_LAPS}  {elapsed:.1f}s")
+                    lap = lap_info['current_lap']
+                    lines.append(self._timed_text(
+                        ('tag', tag.id, lap), lap_info['current_lap_elapsed'],
+                        "Lap {}/{}  {:.1f}s", lap, TOTAL_LAPS))
                 elif lap_info['race_finished']:
                     elp = score_sum['best_elp']
-                    lines.append(f"FINISHED  BestELP={elp:.2f}s")
+                    lines.append(self._label(('fin', tag.id), "FINISHED  BestELP={:.2f}s", elp))
             if speed_info:
                 spd = speed_info.get('instantaneous', 0)
-                lines.append(f"Speed: {spd:.1f} {speed_info.get('unit','')}")
+                lines.append(self._label(('spd', tag.id), "Speed: {:.1f} {}",
+                                         round(spd, 1), speed_info.get('unit','')))
             # wall penalty live counter
-            wh = len(collision_engine.wall_hits(tag.id)) if collision_engine else 0
             if wh:
-                lines.append(f"💥 Wall×{wh} (+{wh*WALL_HIT_PENALTY:.0f}s pen)")
+                lines.append(self._label(('wall', tag.id), "💥 Wall×{} (+{:.0f}s pen)",
+                                         wh, wh*WALL_HIT_PENALTY))
 
-            self.ax.text(px+TAG_RADIUS+4, py, '\n'.join(lines),
+            self.ax.text(px+_TAG_LABEL_DX, py, '\n'.join(lines),
                 fontsize=7.5, color=color, va='center',
-                bbox=dict(boxstyle='round,pad=0.2', facecolor='#1a1a2e', alpha=0.7), zorder=12)
+                bbox=_TAG_BBOX, zorder=12)
+
+        # one collection per layer instead of one artist per tag
+        if trails:
+            self.ax.add_collection(LineCollection(trails, colors=trail_colors,
+                linewidths=1.5, alpha=0.4, zorder=6))
+        dots = self._tag_dots()
+        dots.set_offsets(np.column_stack((pxs[idx], pys[idx])))
+        dots.set_facecolor(dot_colors)
+        dots.set_visible(True)
+        if flash_xy:
+            d = np.full(len(flash_xy), 2*COLLISION_INDICATOR_RADIUS)
+            self.ax.add_collection(EllipseCollection(
+                d, d, 0, units='xy',
+                offsets=flash_xy, offset_transform=self.ax.transData,
+                facecolors='none', edgecolors='red', linewidths=3, zorder=11))
+
+    def _tag_dots(self):
+        """Persistent dot collection, re-pointed at new offsets each frame."""
+        if self._dots is None:
+            # one size for all dots – the single ellipse transform cycles over offsets
+            self._dots = EllipseCollection(
+                [2*TAG_RADIUS], [2*TAG_RADIUS], [0], units='xy',
+                offsets=np.empty((0, 2)), offset_transform=self.ax.transData,
+                edgecolors='none', zorder=10)
+            self.ax.add_collection(self._dots)
+            self._keep.append(self._dots)
+        return self._dots
 
     # ── race status banner ──────────────────────────────────
     def draw_status(self, race_manager, now):
         if race_manager.is_race_active():
             elapsed = now - (race_manager.race_start_time or now)
-            txt = f"● RACE IN PROGRESS  {elapsed:.1f}s"
+            txt = self._timed_text('status', elapsed, "● RACE IN PROGRESS  {:.1f}s")
             fc  = '#003300'
         else:
             txt = "⏸  WAITING FOR RACE START"
@@ -184,44 +395,74 @@ class MatplotlibRenderer:
             zorder=20)
 
     # ── ELP leaderboard ─────────────────────────────────────
-    def draw_leaderboard(self, race_manager, now):
-        lb = race_manager.get_leaderboard()
-        lines  = ["═══ BEST-ELP LEADERBOARD ═══",
-                  f"{'Pos':<4}{'Car':<8}{'BestELP':>9}{'Laps':>6}{'Qlfy':>6}",
-                  "─"*38]
-        for i, row in enumerate(lb):
+    def _elp_rows(self, race_manager):
+        # the ELP table only changes when a lap closes / race state changes
+        ver = race_manager.state_version()
+        if self._elp_rows_cache[0] == ver:
+            return self._elp_rows_cache[1]
+        rows = []
+        for i, row in enumerate(race_manager.get_leaderboard()):
             elp  = row['best_elp']
-            elps = f"{elp:.2f}s" if elp < float('inf') else "—"
-            q    = "✓" if row['qualifies'] else f"({row['laps_done']}/{MIN_LAPS_TO_QUALIFY})"
-            lines.append(f"{i+1:<4}{row['car_name']:<8}{elps:>9}{row['laps_done']:>6}{q:>6}")
+            elps = "{:.2f}s".format(elp) if elp < float('inf') else "—"
+            q    = "✓" if row['qualifies'] else _LB_QLFY(row['laps_done'], MIN_LAPS_TO_QUALIFY)
+            rows.append(_LB_ROW(i+1, row['car_name'], elps, row['laps_done'], q))
+        self._elp_rows_cache = (ver, rows)
+        return rows
+
+    def draw_leaderboard(self, race_manager, now):
+        lines = list(_LB_HEAD)
+        lines += self._elp_rows(race_manager)
 
         # live lap info
         lines += ["", "─── LIVE LAPS ───"]
         legacy = race_manager.get_legacy_leaderboard(now)
         for r in legacy:
             if r['is_racing']:
-                el = r.get('current_lap_elapsed', 0)
-                lines.append(f"  {r['car_name']} Lap {r['current_lap']}/{TOTAL_LAPS}  {el:.1f}s")
+                lap = r['current_lap']
+                lines.append(self._timed_text(
+                    ('live', r['car_id'], lap), r.get('current_lap_elapsed', 0),
+                    "  {} Lap {}/{}  {:.1f}s", r['car_name'], lap, TOTAL_LAPS))
 
         self.ax.text(LEADERBOARD_X, LEADERBOARD_Y, '\n'.join(lines),
             fontsize=8, family='monospace', color='white', va='top',
-            bbox=dict(boxstyle='round,pad=0.5', facecolor='#111130', edgecolor='#4444aa', lw=1.5),
+            bbox=_LB_BBOX,
             zorder=20)
 
     # ── incident feed ────────────────────────────────────────
-    def draw_incident_feed(self, scoring_engine):
-        feed = scoring_engine.get_feed(8)
+    def draw_incident_feed(self, feed):
         if not feed: return
         lines = ["═══ INCIDENT FEED ═══"] + [f"  {m}" for m in reversed(feed)]
         self.ax.text(INCIDENT_X, INCIDENT_Y, '\n'.join(lines),
             fontsize=7.5, family='monospace', color='#ffdddd', va='top',
-            bbox=dict(boxstyle='round,pad=0.5', facecolor='#200000', edgecolor='#880000', lw=1),
+            bbox=_FEED_BBOX,
             zorder=20)
 
-    # ── main render ─────────────────────────────────────────
-    def render_frame(self, anchors, tags, race_manager, speed_manager,
-                     collision_engine, show_debug=False, track=None):
-        now = time.time()
+    # ── frame signature ─────────────────────────────────────
+    @staticmethod
+    def _active_flags(tags, now):
+        # once per frame, against the frame timestamp
+        return [bool(t.status) and now - t.last_update < TAG_TIMEOUT for t in tags]
+
+    def _frame_signature(self, tags, active, race_manager, speed_manager,
+                         collision_engine, show_debug, track, now):
+        # elapsed-time labels only tick at 0.1s resolution while racing
+        tick = int(now * 10) if race_manager.is_race_active() else 0
+        # speed can settle after the tag stops moving; 0.1 cm/s is at least
+        # as fine as the 0.1 display-unit label
+        spd = (speed_manager.get_current_speed if speed_manager
+               else lambda _id: 0)
+        return (tuple((t.id, t.x, t.y, on, round(spd(t.id), 1))
+                      for t, on in zip(tags, active)),
+                race_manager.state_version(),
+                collision_engine.version() if collision_engine else 0,
+                tick, show_debug, id(track))
+
+    # ── static layer / blitting ─────────────────────────────
+    def _on_draw(self, event):
+        # any full draw (ours, or a resize) refreshes the saved background
+        self._bg = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+
+    def _draw_static(self, anchors, track, feed):
         self.ax.clear()
         self.ax.set_xlim(0, SCREEN_X); self.ax.set_ylim(0, SCREEN_Y)
         self.ax.set_aspect('equal'); self.ax.invert_yaxis()
@@ -232,14 +473,92 @@ class MatplotlibRenderer:
         self.draw_track(track)
         self.draw_start_line()
         self.draw_anchors(anchors)
-        self.draw_tags(tags, race_manager, speed_manager, collision_engine, now)
+        # the feed only changes on incidents – bake it into the background
+        self.draw_incident_feed(feed)
+        self._dyn = []
+        # ax.clear() dropped the persistent artists too
+        self._dots = None
+        self._keep = []
+        self.fig.canvas.draw()
+        self._frames_since_full = 0
+
+    def _dirty_boxes(self):
+        """Padded display extents of the dynamic artists, or None to blit everything."""
+        renderer = self.fig.canvas.get_renderer()
+        # collections report offsets only; pad by the largest marker + text box margin
+        pad = abs(self.ax.transData.get_matrix()[0, 0]) * COLLISION_INDICATOR_RADIUS + 6
+        boxes = []
+        for a in self._dyn:
+            bb = a.get_window_extent(renderer)
+            if not np.isfinite(bb.get_points()).all():
+                return None
+            boxes.append(bb.padded(pad))
+        return boxes
+
+    # ── main render ─────────────────────────────────────────
+    def render_frame(self, anchors, tags, race_manager, speed_manager,
+                     collision_engine, show_debug=False, track=None, now=None):
+        # one timestamp for the whole frame (signature, labels, flashes, lap clocks)
+        if now is None:
+            now = time.time()
+        active = self._active_flags(tags, now)
+        sig = self._frame_signature(tags, active, race_manager, speed_manager,
+                                    collision_engine, show_debug, track, now)
+        if sig == self._last_frame_sig:
+            # nothing visible changed – keep the GUI responsive, skip recomposition
+            self.fig.canvas.flush_events()
+            return
+        self._last_frame_sig = sig
+
+        feed = tuple(race_manager.scoring.get_feed(8))
+        static_key = (id(track), tuple((a.name, a.x, a.y) for a in anchors), feed)
+        if (static_key != self._static_key or (self._blit and self._bg is None)
+                or self._frames_since_full >= _FULL_REFRESH_FRAMES):
+            self._static_key = static_key
+            self._draw_static(anchors, track, feed)
+            full = True
+        else:
+            full = False
+        self._frames_since_full += 1
+
+        # dynamic layer: drop last frame's artists, draw this frame's
+        for a in self._dyn:
+            if a not in self._keep:
+                a.remove()
+        for a in self._keep:
+            a.set_visible(False)
+        before = set(self.ax.get_children())
+        self._collision_cache = self._index_collisions(collision_engine)
+        self.draw_tags(tags, race_manager, speed_manager, collision_engine, now, active)
+        self._collision_cache = None
         self.draw_status(race_manager, now)
         self.draw_leaderboard(race_manager, now)
-        self.draw_incident_feed(race_manager.scoring)
+        fresh = [a for a in self.ax.get_children()
+                 if a not in before and a not in self._keep]
+        self._dyn = sorted(fresh + [a for a in self._keep if a.get_visible()],
+                           key=lambda a: a.get_zorder())
 
-        self.fig.canvas.draw()
-        self.fig.canvas.flush_events()
-        plt.pause(0.001)
+        canvas = self.fig.canvas
+        if self._blit:
+            canvas.restore_region(self._bg)
+            for a in self._dyn:
+                a.set_animated(True)
+                self.ax.draw_artist(a)
+            # push only what changed: this frame's extents + last frame's (to erase)
+            boxes = None if full else self._dirty_boxes()
+            if boxes is None:
+                canvas.blit(self.fig.bbox)
+                self._prev_dirty = []
+            else:
+                changed = boxes + self._prev_dirty
+                dirty = changed and Bbox.intersection(Bbox.union(changed), self.fig.bbox)
+                if dirty:
+                    canvas.blit(dirty)
+                self._prev_dirty = boxes
+            canvas.flush_events()
+        else:
+            canvas.draw()
+            canvas.flush_events()
 
     def close(self):
         plt.close(self.fig)
\ No newline at end of file
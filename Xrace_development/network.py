@@ -3,10 +3,23 @@ UWB Racing Tracker - Network Module (Stable Positioning)
 Shows tags at fixed positions without jitter
 """
 
+import asyncio
 import socket
 import json
 import time
 import threading
+import numpy as np
+from config import ANCHOR_COUNT
+
+class _RaceProtocol(asyncio.DatagramProtocol):
+    """Hands each datagram straight to the receiver"""
+
+    def __init__(self, receiver):
+        self.receiver = receiver
+
+    def datagram_received(self, data, addr):
+        self.receiver._on_datagram(data, addr)
+
 
 class UDPReceiver:
     """UDP receiver with stable fixed positioning"""
@@ -15,12 +28,13 @@ class UDPReceiver:
         """Initialize UDP receiver"""
         self.port = port
         self.tags = tags if tags else []
+        self._alloc_measurements()
         
         # Socket setup
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.sock.bind(('', self.port))
-        self.sock.settimeout(0.1)
+        self.sock.setblocking(False)
         
         # Statistics
         self.running = True
@@ -34,6 +48,10 @@ class UDPReceiver:
         # Track which tags we've seen
         self.tags_initialized = set()
         
+        # Receiver thread runs its own asyncio loop (set once it is up)
+        self._loop = None
+        self._loop_ready = threading.Event()
+
         # Start receiver thread
         self.thread = threading.Thread(target=self._receive_loop, daemon=True)
         self.thread.start()
@@ -44,29 +62,54 @@ class UDPReceiver:
     def set_tags(self, tags):
         """Set the tag list for updating"""
         self.tags = tags
+        self._alloc_measurements()
+
+    def _alloc_measurements(self):
+        """SoA measurement buffers: one row per tag, one column per anchor"""
+        n = len(self.tags)
+        # float64 so the positioning kernels take the rows without a copy
+        self.ranges = np.zeros((n, ANCHOR_COUNT), dtype=np.float64)
+        self.rssi   = np.zeros((n, ANCHOR_COUNT), dtype=np.float64)
+
+    @staticmethod
+    def _fill_row(row, values):
+        k = min(len(values), len(row))
+        row[:k] = values[:k]
+        row[k:] = 0
 
     def _receive_loop(self):
-        """Main receiver loop"""
-        while self.running:
-            try:
-                data, addr = self.sock.recvfrom(2048)
-                self.packets_received += 1
-                self.second_counter += 1
-                self.last_packet_time = time.time()
-
-                # Update packets per second
-                if time.time() - self.last_second >= 1.0:
-                    self.packets_per_second = self.second_counter
-                    self.second_counter = 0
-                    self.last_second = time.time()
-
-                message = data.decode('utf-8').strip()
-                self._process_data(message, addr)
-
-            except socket.timeout:
-                continue
-            except:
-                pass
+        """Main receiver loop: event-driven datagram endpoint on the bound socket"""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        transport, _ = loop.run_until_complete(
+            loop.create_datagram_endpoint(lambda: _RaceProtocol(self), sock=self.sock))
+        self._loop = loop
+        self._loop_ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            transport.close()
+            loop.run_until_complete(asyncio.sleep(0))
+            loop.close()
+
+    def _on_datagram(self, data, addr):
+        """Handle one datagram (called on the receiver loop)"""
+        try:
+            self.packets_received += 1
+            self.second_counter += 1
+            now = time.time()
+            self.last_packet_time = now
+
+            # Update packets per second
+            if now - self.last_second >= 1.0:
+                self.packets_per_second = self.second_counter
+                self.second_counter = 0
+                self.last_second = now
+
+            message = data.decode('utf-8').strip()
+            self._process_data(message, addr)
+        except Exception:
+            pass
 
     def _process_data(self, message, addr):
         """Process received UDP message"""
@@ -82,8 +125,11 @@ class UDPReceiver:
             # Validate tag ID
             if 0 <= tag_id < len(self.tags):
                 tag = self.tags[tag_id]
-                tag.range_list = ranges
-                tag.rssi_list = rssi
+                # copy into the preallocated rows; tags hold views, not new lists
+                self._fill_row(self.ranges[tag_id], ranges)
+                self._fill_row(self.rssi[tag_id], rssi)
+                tag.range_list = self.ranges[tag_id]
+                tag.rssi_list = self.rssi[tag_id]
                 tag.quality = "good"
                 tag.anchor_count = 4
                 
@@ -139,6 +185,8 @@ class UDPReceiver:
         print("Stopping UDP receiver...")
         self.running = False
         
+        if self._loop_ready.wait(timeout=1.0):
+            self._loop.call_soon_threadsafe(self._loop.stop)
         if self.thread.is_alive():
             self.thread.join(timeout=1.0)
         
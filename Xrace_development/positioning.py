@@ -4,10 +4,12 @@ Contains all trilateration and multilateration algorithms
 """
 
 import math
+import numpy as np
 from config import (
     RSSI_EXCELLENT, RSSI_POOR, RSSI_MIN_WEIGHT, 
     RSSI_NORMALIZATION, PRINT_CALCULATION_DETAILS
 )
+from jit_support import njit, NUMBA_AVAILABLE
 
 
 class PositioningAlgorithms:
@@ -33,36 +35,53 @@ class PositioningAlgorithms:
         weight = max(RSSI_MIN_WEIGHT, 1.0 + normalized_rssi)
         return weight
 
+    @staticmethod
+    def calculate_rssi_weights(rssi):
+        """
+        Vectorised calculate_rssi_weight over an array of RSSI values
+        
+        Args:
+            rssi: Array of RSSI values in dBm
+            
+        Returns:
+            ndarray: Weights between RSSI_MIN_WEIGHT and 1.0
+        """
+        normalized_rssi = (rssi + (RSSI_EXCELLENT + RSSI_POOR) / 2) / RSSI_NORMALIZATION
+        weights = np.maximum(RSSI_MIN_WEIGHT, 1.0 + normalized_rssi)
+        return np.where(rssi >= 0, 1.0, weights)
+
     @staticmethod
     def get_valid_anchors(range_list, rssi_list, anchors):
         """
         Extract valid anchor measurements with weights
         
         Args:
-            range_list: List of ranges to each anchor
-            rssi_list: List of RSSI values
+            range_list: Ranges to each anchor (list or float64 ndarray)
+            rssi_list: RSSI values (list or float64 ndarray)
             anchors: List of anchor objects
             
         Returns:
             list: List of dicts with anchor info and weights
         """
-        valid_anchors = []
-        
-        for i in range(min(len(range_list), len(anchors))):
-            if range_list[i] > 0:
-                # Calculate weight by RSSI
-                rssi = rssi_list[i] if i < len(rssi_list) else 0
-                weight = PositioningAlgorithms.calculate_rssi_weight(rssi)
-                
-                valid_anchors.append({
-                    'id': i,
-                    'range': range_list[i],
-                    'rssi': rssi,
-                    'weight': weight,
-                    'anchor': anchors[i]
-                })
+        n = min(len(range_list), len(anchors))
+        # float64 ndarray rows (UDPReceiver) pass through as views, no copy
+        ranges = np.asarray(range_list[:n], dtype=np.float64)
+        if len(rssi_list) >= n:
+            rssi = np.asarray(rssi_list[:n], dtype=np.float64)
+        else:
+            rssi = np.zeros(n)
+            rssi[:len(rssi_list)] = rssi_list
+
+        # Validity mask and RSSI weights for all anchors at once
+        weights = PositioningAlgorithms.calculate_rssi_weights(rssi)
         
-        return valid_anchors
+        return [{
+            'id': i,
+            'range': float(ranges[i]),
+            'rssi': float(rssi[i]),
+            'weight': float(weights[i]),
+            'anchor': anchors[i]
+        } for i in np.flatnonzero(ranges > 0).tolist()]
 
     @staticmethod
     def weighted_multilateration(valid_anchors):
@@ -77,43 +96,26 @@ class PositioningAlgorithms:
         """
         if len(valid_anchors) < 3:
             return 0, 0
-        
-        combinations = []
-        
-        # Generate all possible 3-anchor combinations
-        for i in range(len(valid_anchors)):
-            for j in range(i + 1, len(valid_anchors)):
-                for k in range(j + 1, len(valid_anchors)):
-                    a1, a2, a3 = valid_anchors[i], valid_anchors[j], valid_anchors[k]
-                    
-                    # Get anchor positions
-                    x1, y1 = a1['anchor'].x, a1['anchor'].y
-                    x2, y2 = a2['anchor'].x, a2['anchor'].y
-                    x3, y3 = a3['anchor'].x, a3['anchor'].y
-                    
-                    # Calculate position using this combination
-                    px, py = PositioningAlgorithms.trilaterate_3points(
-                        x1, y1, a1['range'],
-                        x2, y2, a2['range'],
-                        x3, y3, a3['range']
-                    )
-                    
-                    # Weight by combined RSSI quality
-                    weight = (a1['weight'] + a2['weight'] + a3['weight']) / 3
-                    combinations.append((px, py, weight))
-        
-        # Weighted average of all combinations
-        if combinations:
-            total_w = sum(c[2] for c in combinations)
-            if total_w > 0:
-                x = sum(c[0] * c[2] for c in combinations) / total_w
-                y = sum(c[1] * c[2] for c in combinations) / total_w
-                
-                if PRINT_CALCULATION_DETAILS:
-                    print(f"Multilateration: {len(combinations)} combinations, result: ({x:.1f}, {y:.1f})")
-                
-                return x, y
-        
+
+        # Pack the measurements into contiguous arrays once per packet
+        n = len(valid_anchors)
+        anchor_xs = np.empty(n)
+        anchor_ys = np.empty(n)
+        ranges = np.empty(n)
+        weights = np.empty(n)
+        for i, a in enumerate(valid_anchors):
+            anchor_xs[i] = a['anchor'].x
+            anchor_ys[i] = a['anchor'].y
+            ranges[i] = a['range']
+            weights[i] = a['weight']
+
+        x, y, count, total_w = _multilaterate(anchor_xs, anchor_ys, ranges, weights)
+
+        if total_w > 0:
+            if PRINT_CALCULATION_DETAILS:
+                print(f"Multilateration: {count} combinations, result: ({x:.1f}, {y:.1f})")
+            return x, y
+
         return 0, 0
 
     @staticmethod
@@ -132,25 +134,9 @@ class PositioningAlgorithms:
         Returns:
             tuple: (x, y) calculated position
         """
-        # Using the analytical solution for 3-circle intersection
-        A = 2 * (x2 - x1)
-        B = 2 * (y2 - y1)
-        C = r1 ** 2 - r2 ** 2 - x1 ** 2 + x2 ** 2 - y1 ** 2 + y2 ** 2
-
-        D = 2 * (x3 - x2)
-        E = 2 * (y3 - y2)
-        F = r2 ** 2 - r3 ** 2 - x2 ** 2 + x3 ** 2 - y2 ** 2 + y3 ** 2
-
-        # Solve system of equations
-        denom = A * E - B * D
-        if abs(denom) < 0.001:
-            # Circles are collinear, use 2-point method
-            return PositioningAlgorithms.two_circles(x1, y1, x2, y2, r1, r2)
-
-        x = (C * E - F * B) / denom
-        y = (C * D - A * F) / denom * -1
-
-        return x, y
+        return _trilaterate_3points(float(x1), float(y1), float(r1),
+                                    float(x2), float(y2), float(r2),
+                                    float(x3), float(y3), float(r3))
 
     @staticmethod
     def two_circles(x1, y1, x2, y2, r1, r2):
@@ -166,22 +152,22 @@ class PositioningAlgorithms:
         Returns:
             tuple: (x, y) intersection point
         """
-        d = math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
-        
-        if d == 0:
-            return x1, y1
+        return _two_circles(float(x1), float(y1), float(x2), float(y2),
+                            float(r1), float(r2))
 
-        if r1 + r2 <= d:
-            # Circles don't intersect - return point on line between centers
-            ratio = r1 / (r1 + r2)
-            return x1 + (x2 - x1) * ratio, y1 + (y2 - y1) * ratio
-        else:
-            # Circles intersect - calculate intersection point
-            a = (r1 ** 2 - r2 ** 2 + d ** 2) / (2 * d)
-            h = math.sqrt(max(0, r1 ** 2 - a ** 2))
-            px = x1 + a * (x2 - x1) / d
-            py = y1 + a * (y2 - y1) / d
-            return px, py
+    @staticmethod
+    def warm_up():
+        """
+        Compile the positioning kernels ahead of the first packet
+        
+        Call once at race start so the JIT cost is not paid inside the
+        receive loop. No-op without numba.
+        """
+        if not NUMBA_AVAILABLE:
+            return
+        xs = np.array([0.0, 100.0, 0.0, 100.0])
+        ys = np.array([0.0, 0.0, 100.0, 100.0])
+        _multilaterate(xs, ys, np.full(4, 70.0), np.ones(4))
 
     @staticmethod
     def calculate_position_quality(anchor_count):
@@ -208,3 +194,67 @@ class PositioningAlgorithms:
             return "fair"
         else:
             return "poor"
+
+
+# ── JIT kernels ─────────────────────────────────────────────────────────────
+
+@njit(cache=True, fastmath=True)
+def _two_circles(x1, y1, x2, y2, r1, r2):
+    d = math.hypot(x2 - x1, y2 - y1)
+
+    if d == 0:
+        return x1, y1
+
+    if r1 + r2 <= d:
+        # Circles don't intersect - return point on line between centers
+        ratio = r1 / (r1 + r2)
+        return x1 + (x2 - x1) * ratio, y1 + (y2 - y1) * ratio
+
+    # Circles intersect - point on the chord between centers
+    a = (r1 ** 2 - r2 ** 2 + d ** 2) / (2 * d)
+    return x1 + a * (x2 - x1) / d, y1 + a * (y2 - y1) / d
+
+
+@njit(cache=True, fastmath=True)
+def _trilaterate_3points(x1, y1, r1, x2, y2, r2, x3, y3, r3):
+    # Using the analytical solution for 3-circle intersection
+    A = 2 * (x2 - x1)
+    B = 2 * (y2 - y1)
+    C = r1 ** 2 - r2 ** 2 - x1 ** 2 + x2 ** 2 - y1 ** 2 + y2 ** 2
+
+    D = 2 * (x3 - x2)
+    E = 2 * (y3 - y2)
+    F = r2 ** 2 - r3 ** 2 - x2 ** 2 + x3 ** 2 - y2 ** 2 + y3 ** 2
+
+    denom = A * E - B * D
+    if abs(denom) < 0.001:
+        # Circles are collinear, use 2-point method
+        return _two_circles(x1, y1, x2, y2, r1, r2)
+
+    return (C * E - F * B) / denom, (C * D - A * F) / denom * -1
+
+
+@njit(cache=True, fastmath=True)
+def _multilaterate(anchor_xs, anchor_ys, ranges, weights):
+    """Weighted mean over every 3-anchor combination -> (x, y, count, total_w)."""
+    n = anchor_xs.shape[0]
+    sx = 0.0
+    sy = 0.0
+    total_w = 0.0
+    count = 0
+    for i in range(n):
+        for j in range(i + 1, n):
+            for k in range(j + 1, n):
+                px, py = _trilaterate_3points(
+                    anchor_xs[i], anchor_ys[i], ranges[i],
+                    anchor_xs[j], anchor_ys[j], ranges[j],
+                    anchor_xs[k], anchor_ys[k], ranges[k])
+                # Weight by combined RSSI quality
+                w = (weights[i] + weights[j] + weights[k]) / 3
+                sx += px * w
+                sy += py * w
+                total_w += w
+                count += 1
+    if total_w > 0:
+        return sx / total_w, sy / total_w, count, total_w
+    return 0.0, 0.0, count, total_w
@@ -10,6 +10,8 @@ ANCHOR_POSITIONS = {0:(0,0), 1:(200,0), 2:(200,200), 3:(0,200)}
 SCREEN_X        = 1400
 SCREEN_Y        = 900
 REFRESH_RATE    = 0.033
+SIM_DT          = 0.01    # s  fixed race-update step (render runs at REFRESH_RATE)
+SIM_MAX_STEPS   = 5       # catch-up cap per loop pass after a stall
 GRID_SPACING_CM = 50
 TAG_RADIUS      = 14
 ANCHOR_RADIUS   = 8
@@ -74,6 +76,8 @@ SPEED_UPDATE_INTERVAL = 0.1
 # ── Logging ───────────────────────────────────────────────────
 ENABLE_RACE_LOGGING = True
 RACE_LOG_FILE       = 'race_events.csv'
+LOG_FLUSH_INTERVAL  = 1.0    # s  log writes are buffered, flushed at most this often
+FEED_CAPACITY       = 256    # incident-feed messages kept in memory
 LOG_LAP_TIMES       = True
 LOG_COLLISIONS      = True
 LOG_POSITIONS       = False
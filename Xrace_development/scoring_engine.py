@@ -1,6 +1,8 @@
 """Scoring Engine – ELP = Raw Lap Time + penalties - bonuses"""
 import time
-from collections import defaultdict
+from collections import deque
+from itertools import islice
+import numpy as np
 from race_config import *
 
 class LapScore:
@@ -30,15 +32,15 @@ class LapScore:
         self.corner_cuts+=1
         if CORNER_CUT_VOID_LAP:
             self.voided=True
-            print(f"  ⛔ VOID  | {self.car_name} Lap {self.lap_number}")
+            if PRINT_LAP_EVENTS: print(f"  ⛔ VOID  | {self.car_name} Lap {self.lap_number}")
         else:
             self._pen+=CORNER_CUT_PENALTY
-            print(f"  🔶 CUT   | {self.car_name} Lap {self.lap_number} +{CORNER_CUT_PENALTY}s")
+            if PRINT_LAP_EVENTS: print(f"  🔶 CUT   | {self.car_name} Lap {self.lap_number} +{CORNER_CUT_PENALTY}s")
 
     def add_overspeed(self):
         if not self.overspeed:
             self.overspeed=True; self._pen+=PIT_ZONE_OVERSPEED_PENALTY
-            print(f"  🚨 SPD   | {self.car_name} Lap {self.lap_number} +{PIT_ZONE_OVERSPEED_PENALTY}s")
+            if PRINT_LAP_EVENTS: print(f"  🚨 SPD   | {self.car_name} Lap {self.lap_number} +{PIT_ZONE_OVERSPEED_PENALTY}s")
 
     @property
     def elp(self):
@@ -51,22 +53,65 @@ class LapScore:
                     voided=self.voided,closed_at=self.closed_at)
 
 
+class LapHistory:
+    """Closed laps of one car as NumPy columns (capacity doubles on demand)."""
+    _COLS=(('lap',np.int32),('raw',np.float64),('pen',np.float64),('bon',np.float64),
+           ('voided',np.bool_),('closed_at',np.float64))
+
+    def __init__(self,capacity=16):
+        self.n=0
+        for name,dt in self._COLS: setattr(self,name,np.zeros(capacity,dtype=dt))
+
+    def __len__(self): return self.n
+
+    def append(self,lap):
+        i=self.n
+        if i==len(self.raw):
+            for name,_ in self._COLS:
+                col=getattr(self,name); grown=np.zeros(2*len(col),dtype=col.dtype)
+                grown[:i]=col; setattr(self,name,grown)
+        self.lap[i]=lap.lap_number; self.raw[i]=lap.raw_time
+        self.pen[i]=lap._pen; self.bon[i]=lap._bon
+        self.voided[i]=lap.voided; self.closed_at[i]=lap.closed_at or 0.0
+        self.n=i+1
+
+    def elp(self):
+        n=self.n
+        e=np.maximum(0.0,self.raw[:n]+self.pen[:n]-self.bon[:n])
+        e[self.voided[:n]]=np.inf
+        return e
+
+    def to_dicts(self,car_id,car_name):
+        n=self.n; elp=self.elp()
+        return [dict(car_id=car_id,car_name=car_name,lap=int(self.lap[i]),
+                     raw=round(float(self.raw[i]),3),penalty=round(float(self.pen[i]),3),
+                     bonus=round(float(self.bon[i]),3),elp=round(float(elp[i]),3),
+                     voided=bool(self.voided[i]),closed_at=float(self.closed_at[i]))
+                for i in range(n)]
+
+
 class ScoringEngine:
     def __init__(self):
-        self._history=defaultdict(list)
-        self._open={}; self._names={}; self._feed=[]
+        self._history={}   # car_id -> LapHistory
+        self._open={}; self._names={}; self._feed=deque(maxlen=FEED_CAPACITY)
+        # leaderboard / best ELP only depend on closed laps + names
+        self._lb_cache=None; self._best_cache={}
 
-    def register(self,car_id,car_name): self._names[car_id]=car_name
+    def register(self,car_id,car_name):
+        self._names[car_id]=car_name; self._lb_cache=None
 
     def open_lap(self,car_id,lap_number):
-        self._open[car_id]=LapScore(car_id,self._names.get(car_id,f"Car{car_id}"),lap_number)
+        self._open[car_id]=LapScore(car_id,(self._names.get(car_id) or f"Car{car_id}"),lap_number)
 
     def close_lap(self,car_id,raw_time):
         lap=self._open.pop(car_id,None)
         if lap is None:
-            lap=LapScore(car_id,self._names.get(car_id,f"Car{car_id}"),0)
+            lap=LapScore(car_id,(self._names.get(car_id) or f"Car{car_id}"),0)
         lap.raw_time=raw_time; lap.closed_at=time.time()
-        self._history[car_id].append(lap)
+        hist=self._history.get(car_id)
+        if hist is None: hist=self._history[car_id]=LapHistory()
+        hist.append(lap)
+        self._lb_cache=None; self._best_cache.pop(car_id,None)
         msg=(f"📊 LAP | {lap.car_name} Lap {lap.lap_number} "
              f"raw={raw_time:.2f}s ELP={lap.elp:.2f}s")
         if PRINT_LAP_EVENTS: print(msg)
@@ -77,56 +122,69 @@ class ScoringEngine:
 
     def wall_hit(self,car_id):
         lap=self._open.get(car_id)
-        if lap:
-            lap.add_wall_hit()
-            self._feed.append(f"🚧 WALL {self._names.get(car_id,'?')} Lap {lap.lap_number} +{WALL_HIT_PENALTY}s")
+        if lap is None: return
+        lap.add_wall_hit()
+        self._feed.append(f"🚧 WALL {lap.car_name} Lap {lap.lap_number} +{WALL_HIT_PENALTY}s")
 
     def car_collision(self,attacker_id,victim_id):
-        a=self._open.get(attacker_id); v=self._open.get(victim_id)
-        if a: a.add_attacker_penalty()
-        if v: v.add_victim_bonus()
-        an=self._names.get(attacker_id,'?'); vn=self._names.get(victim_id,'?')
+        get_open=self._open.get; get_name=self._names.get
+        a=get_open(attacker_id); v=get_open(victim_id)
+        if a is not None: a.add_attacker_penalty(); an=a.car_name
+        else: an=get_name(attacker_id,'?')
+        if v is not None: v.add_victim_bonus(); vn=v.car_name
+        else: vn=get_name(victim_id,'?')
         self._feed.append(f"💥 {an}→{vn} | {an}+{CAR_COLLISION_ATTACKER_PENALTY}s | {vn}-{CAR_COLLISION_VICTIM_BONUS}s")
 
     def corner_cut(self,car_id):
         lap=self._open.get(car_id)
-        if lap: lap.add_corner_cut()
+        if lap is not None: lap.add_corner_cut()
 
     def overspeed(self,car_id):
         lap=self._open.get(car_id)
-        if lap: lap.add_overspeed()
+        if lap is not None: lap.add_overspeed()
 
     def best_elp(self,car_id):
-        valid=[l.elp for l in self._history.get(car_id,[]) if not l.voided]
-        return min(valid) if valid else float('inf')
+        best=self._best_cache.get(car_id)
+        if best is None:
+            hist=self._history.get(car_id)
+            best=self._best_cache[car_id]=float(hist.elp().min()) if hist else float('inf')
+        return best
 
-    def laps_done(self,car_id): return len(self._history.get(car_id,[]))
+    def laps_done(self,car_id): return len(self._history.get(car_id,()))
     def qualifies(self,car_id): return self.laps_done(car_id)>=MIN_LAPS_TO_QUALIFY
 
     def get_leaderboard(self):
-        rows=[]
-        for cid,laps in self._history.items():
-            valid=[l for l in laps if not l.voided]
-            if not valid: continue
-            best=min(valid,key=lambda l:(l.elp,l.closed_at or 0))
-            rows.append(dict(car_id=cid,car_name=self._names.get(cid,f"Car{cid}"),
-                best_elp=best.elp,best_raw=best.raw_time,best_lap=best.lap_number,
-                laps_done=len(laps),qualifies=self.qualifies(cid),
-                penalty_total=sum(l._pen for l in laps),
-                bonus_total=sum(l._bon for l in laps)))
+        """ELP-sorted rows; cached until the next closed lap / reset (treat as read-only)."""
+        if self._lb_cache is not None: return self._lb_cache
+        rows=[]; best_cache=self._best_cache
+        for cid,h in self._history.items():
+            n=h.n
+            if not n: continue
+            # laps are stored in closing order, so argmin's first-hit breaks ELP ties by closed_at
+            elp=h.elp(); b=int(np.argmin(elp)); best=float(elp[b])
+            best_cache[cid]=best
+            if best==float('inf'): continue   # every lap voided
+            rows.append(dict(car_id=cid,car_name=(self._names.get(cid) or f"Car{cid}"),
+                best_elp=best,best_raw=float(h.raw[b]),best_lap=int(h.lap[b]),
+                laps_done=n,qualifies=n>=MIN_LAPS_TO_QUALIFY,
+                penalty_total=float(h.pen[:n].sum()),
+                bonus_total=float(h.bon[:n].sum())))
         rows.sort(key=lambda r:(r['best_elp'],r['best_lap']))
+        self._lb_cache=rows
         return rows
 
     def get_car_summary(self,car_id):
-        laps=self._history.get(car_id,[]); op=self._open.get(car_id)
-        return dict(car_id=car_id,car_name=self._names.get(car_id,f"Car{car_id}"),
-                    laps_done=len(laps),best_elp=self.best_elp(car_id),
+        hist=self._history.get(car_id); op=self._open.get(car_id)
+        name=op.car_name if op is not None else self._names.get(car_id) or f"Car{car_id}"
+        return dict(car_id=car_id,car_name=name,
+                    laps_done=len(hist) if hist else 0,best_elp=self.best_elp(car_id),
                     qualifies=self.qualifies(car_id),
                     open_lap=op.to_dict() if op else None,
-                    history=[l.to_dict() for l in laps])
+                    history=hist.to_dicts(car_id,name) if hist else [])
 
-    def get_feed(self,n=8): return self._feed[-n:]
+    def get_feed(self,n=8): return list(islice(self._feed,max(0,len(self._feed)-n),None))
 
     def reset(self):
         self._history.clear(); self._open.clear(); self._feed.clear()
+        self._lb_cache=None; self._best_cache.clear()
         print("📊 Scoring engine reset")
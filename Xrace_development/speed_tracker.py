@@ -5,8 +5,42 @@ Handles speed tracking and calculation for racing cars
 
 import time
 import math
-from collections import deque
+import numpy as np
 from race_config import *
+from jit_support import njit, NUMBA_AVAILABLE
+
+# cm/s -> SPEED_DISPLAY_UNIT, fixed for the whole run (unknown units stay cm/s)
+_SPEED_FACTOR = {'cm/s': 1.0, 'm/s': 0.01, 'km/h': 0.036}.get(SPEED_DISPLAY_UNIT, 1.0)
+
+
+@njit(cache=True, fastmath=True)
+def _speed_kernel(xs, ys, ts, head, count):
+    """
+    Walk a speed ring buffer in nopython mode
+    
+    Args:
+        xs, ys, ts: Ring buffers of X/Y (cm) and timestamps
+        head: Next write slot
+        count: Number of valid samples (>= 2)
+        
+    Returns:
+        tuple: (instantaneous, average) speed in cm/s
+    """
+    n = xs.shape[0]
+    start = (head - count) % n
+    total = 0.0
+    inst = 0.0
+    for k in range(1, count):
+        i1 = (start + k - 1) % n
+        i2 = (start + k) % n
+        step = math.hypot(xs[i2] - xs[i1], ys[i2] - ys[i1])
+        total += step
+        if k == count - 1:
+            dt = ts[i2] - ts[i1]
+            inst = step / dt if dt > 0 else 0.0
+    span = ts[(head - 1) % n] - ts[start]
+    avg = total / span if span > 0 else 0.0
+    return inst, avg
 
 
 class SpeedTracker:
@@ -23,8 +57,18 @@ class SpeedTracker:
         self.car_id = car_id
         self.car_name = car_name
         
-        # Position history for speed calculation
-        self.position_history = deque(maxlen=SPEED_AVERAGE_SAMPLES)
+        # Position history for speed calculation: parallel ring buffers
+        # (float64 – epoch timestamps do not fit float32 precision)
+        self._xs = np.empty(SPEED_AVERAGE_SAMPLES, dtype=np.float64)
+        self._ys = np.empty(SPEED_AVERAGE_SAMPLES, dtype=np.float64)
+        self._ts = np.empty(SPEED_AVERAGE_SAMPLES, dtype=np.float64)
+        self._head = 0    # next write slot
+        self._count = 0   # valid samples
+        # Running path length for the no-numba path: _steps[i] is the step
+        # into sample i, _path the sum of the steps inside the window
+        self._steps = [0.0] * SPEED_AVERAGE_SAMPLES
+        self._path = 0.0
+        self._prev = None  # newest sample as (x, y, t)
         
         # Speed data
         self.instantaneous_speed = 0  # cm/s
@@ -33,12 +77,15 @@ class SpeedTracker:
         
         # Lap-based speed tracking
         self.lap_speeds = []  # Average speed for each completed lap
-        self.current_lap_speeds = []  # Speed samples for current lap
+        self._cur_sum = 0.0  # Running sum of speed samples for current lap
+        self._cur_n = 0  # Speed samples in current lap
         
         # Update timing
         self.last_update_time = 0
     
-    def update(self, x, y, current_time):
+    def update(self, x, y, current_time,
+               _N=SPEED_AVERAGE_SAMPLES, _jit=NUMBA_AVAILABLE, _kernel=_speed_kernel,
+               _hypot=math.hypot):
         """
         Update speed calculation with new position
         
@@ -46,30 +93,61 @@ class SpeedTracker:
             x: Current X position in cm
             y: Current Y position in cm
             current_time: Current timestamp
+        
+        The underscore defaults bind per-sample constants as fast locals;
+        callers never pass them.
         """
         # Add to position history
-        self.position_history.append({
-            'x': x,
-            'y': y,
-            'time': current_time
-        })
+        h = self._head
+        self._xs[h] = x
+        self._ys[h] = y
+        self._ts[h] = current_time
+        self._head = (h + 1) % _N
+        full = self._count == _N
+        count = self._count = min(self._count + 1, _N)
+        prev, self._prev = self._prev, (x, y, current_time)
         
         # Need at least 2 points to calculate speed
-        if len(self.position_history) < 2:
+        if count < 2:
             return
         
-        # Calculate instantaneous speed (last 2 points)
-        self._calculate_instantaneous_speed()
-        
-        # Calculate average speed (all points in buffer)
-        self._calculate_average_speed()
+        if _jit:
+            # Instantaneous + average speed in one compiled pass
+            self.instantaneous_speed, self.average_speed = _kernel(
+                self._xs, self._ys, self._ts, self._head, count)
+        else:
+            # O(1) per sample: the new step joins the window, and once the
+            # ring is full the step into the evicted sample's successor leaves
+            px, py, pt = prev
+            step = _hypot(x - px, y - py)
+            steps = self._steps
+            steps[h] = step
+            if full:
+                oldest = self._head
+                if oldest == 0:
+                    # resync once per wrap so rounding can't accumulate
+                    self._path = math.fsum(steps) - steps[0]
+                else:
+                    self._path += step - steps[oldest]
+            else:
+                oldest = 0
+                self._path += step
+            
+            # Instantaneous speed (last 2 points)
+            dt = current_time - pt
+            self.instantaneous_speed = step / dt if dt > 0 else 0
+            
+            # Average speed (all points in buffer)
+            span = current_time - float(self._ts[oldest])
+            self.average_speed = self._path / span if span > 0 else 0
         
         # Track max speed
         if self.instantaneous_speed > self.max_speed:
             self.max_speed = self.instantaneous_speed
         
-        # Add to current lap speeds
-        self.current_lap_speeds.append(self.instantaneous_speed)
+        # Accumulate current lap average
+        self._cur_sum += self.instantaneous_speed
+        self._cur_n += 1
         
         self.last_update_time = current_time
         
@@ -77,58 +155,11 @@ class SpeedTracker:
             print(f"{self.car_name} - Instant: {self.get_speed_display('instantaneous')}, "
                   f"Avg: {self.get_speed_display('average')}")
     
-    def _calculate_instantaneous_speed(self):
-        """Calculate instantaneous speed from last 2 positions"""
-        if len(self.position_history) < 2:
-            return
-        
-        p1 = self.position_history[-2]
-        p2 = self.position_history[-1]
-        
-        # Calculate distance
-        dx = p2['x'] - p1['x']
-        dy = p2['y'] - p1['y']
-        distance = math.sqrt(dx * dx + dy * dy)
-        
-        # Calculate time difference
-        dt = p2['time'] - p1['time']
-        
-        # Avoid division by zero
-        if dt > 0:
-            self.instantaneous_speed = distance / dt  # cm/s
-        else:
-            self.instantaneous_speed = 0
-    
-    def _calculate_average_speed(self):
-        """Calculate average speed from position history"""
-        if len(self.position_history) < 2:
-            return
-        
-        # Calculate total distance traveled
-        total_distance = 0
-        for i in range(1, len(self.position_history)):
-            p1 = self.position_history[i-1]
-            p2 = self.position_history[i]
-            
-            dx = p2['x'] - p1['x']
-            dy = p2['y'] - p1['y']
-            total_distance += math.sqrt(dx * dx + dy * dy)
-        
-        # Calculate total time
-        total_time = (self.position_history[-1]['time'] - 
-                     self.position_history[0]['time'])
-        
-        # Calculate average speed
-        if total_time > 0:
-            self.average_speed = total_distance / total_time  # cm/s
-        else:
-            self.average_speed = 0
-    
     def on_lap_complete(self):
         """Called when a lap is completed"""
-        if self.current_lap_speeds:
+        if self._cur_n:
             # Calculate average speed for this lap
-            lap_avg_speed = sum(self.current_lap_speeds) / len(self.current_lap_speeds)
+            lap_avg_speed = self._cur_sum / self._cur_n
             self.lap_speeds.append(lap_avg_speed)
             
             if PRINT_LAP_EVENTS:
@@ -136,7 +167,8 @@ class SpeedTracker:
                       f"Avg Speed: {self._convert_speed(lap_avg_speed):.2f} {SPEED_DISPLAY_UNIT}")
             
             # Clear for next lap
-            self.current_lap_speeds = []
+            self._cur_sum = 0.0
+            self._cur_n = 0
     
     def _convert_speed(self, speed_cm_s):
         """
@@ -148,14 +180,7 @@ class SpeedTracker:
         Returns:
             float: Speed in display unit
         """
-        if SPEED_DISPLAY_UNIT == 'cm/s':
-            return speed_cm_s
-        elif SPEED_DISPLAY_UNIT == 'm/s':
-            return speed_cm_s / 100
-        elif SPEED_DISPLAY_UNIT == 'km/h':
-            return (speed_cm_s / 100) * 3.6  # m/s to km/h
-        else:
-            return speed_cm_s
+        return speed_cm_s * _SPEED_FACTOR
     
     def get_speed_display(self, speed_type='instantaneous'):
         """
@@ -216,20 +241,23 @@ class SpeedTracker:
             'average': self._convert_speed(self.average_speed),
             'max': self._convert_speed(self.max_speed),
             'unit': SPEED_DISPLAY_UNIT,
-            'lap_speeds': [self._convert_speed(s) for s in self.lap_speeds],
-            'current_lap_avg': (self._convert_speed(sum(self.current_lap_speeds) / 
-                               len(self.current_lap_speeds)) 
-                               if self.current_lap_speeds else 0)
+            'lap_speeds': (np.asarray(self.lap_speeds) * _SPEED_FACTOR).tolist(),
+            'current_lap_avg': (self._convert_speed(self._cur_sum / self._cur_n)
+                               if self._cur_n else 0)
         }
     
     def reset(self):
         """Reset speed tracker"""
-        self.position_history.clear()
+        self._head = 0
+        self._count = 0
+        self._path = 0.0
+        self._prev = None
         self.instantaneous_speed = 0
         self.average_speed = 0
         self.max_speed = 0
         self.lap_speeds = []
-        self.current_lap_speeds = []
+        self._cur_sum = 0.0
+        self._cur_n = 0
         self.last_update_time = 0
 
 
@@ -249,6 +277,10 @@ class SpeedManager:
             car_name: Car display name
         """
         if car_id not in self.speed_trackers:
+            if NUMBA_AVAILABLE and not self.speed_trackers:
+                # Compile (or load from cache) before the first live sample
+                warm = np.arange(3, dtype=np.float64)
+                _speed_kernel(warm, warm, warm, 0, 3)
             self.speed_trackers[car_id] = SpeedTracker(car_id, car_name)
             print(f"📊 Speed tracking enabled for {car_name}")
     
@@ -265,6 +297,27 @@ class SpeedManager:
         if car_id in self.speed_trackers:
             self.speed_trackers[car_id].update(x, y, current_time)
     
+    def update_all(self, car_ids, positions, current_time):
+        """
+        Update every car's speed in one call
+        
+        Args:
+            car_ids: Sequence of car identifiers
+            positions: (N, 2) array of X/Y positions in cm, row-aligned with car_ids
+            current_time: Current timestamp (shared by the whole batch)
+            
+        Returns:
+            ndarray: Instantaneous speeds in cm/s (0 for unregistered cars)
+        """
+        speeds = np.zeros(len(car_ids))
+        trackers = self.speed_trackers
+        for i, (car_id, (x, y)) in enumerate(zip(car_ids, positions.tolist())):
+            tracker = trackers.get(car_id)
+            if tracker is not None:
+                tracker.update(x, y, current_time)
+                speeds[i] = tracker.instantaneous_speed
+        return speeds
+    
     def on_lap_complete(self, car_id):
         """
         Notify that a car completed a lap
@@ -0,0 +1,82 @@
+"""
+Regression tests for uwb_device.py
+Run: python -m unittest test_uwb_device   (from Xrace_development/)
+"""
+import random
+import unittest
+
+import uwb_device as uwb
+
+
+class TestStationaryGate(unittest.TestCase):
+
+    def test_slow_creep_keeps_kalman_dt(self):
+        # 3 cm/s creep at ~30 Hz: most packets fall inside the stationary
+        # gate, so the filter must step on the time since its last fix
+        tag = uwb.TagState(0)
+        speed, period = 3.0, 0.033
+        t0 = 1000.0
+        peak_vx = 0.0
+        for i in range(int(80 / (speed * period)) + 1):
+            now = t0 + i * period
+            tag.update_position(speed * (now - t0), 50.0, 'excellent', 4, now)
+            if i > 60:
+                peak_vx = max(peak_vx, abs(tag.kalman.vx))
+        true_x = speed * (now - t0)
+        self.assertLess(peak_vx, 2 * speed)
+        # the gate may hold the last fix for up to STATIONARY_EPS_CM of travel
+        self.assertAlmostEqual(tag.x, true_x, delta=uwb.STATIONARY_EPS_CM)
+        self.assertAlmostEqual(tag.x, tag.raw_x, delta=0.1)
+
+    def test_parked_tag_is_gated(self):
+        tag = uwb.TagState(0)
+        tag.update_position(10.0, 10.0, 'excellent', 4, 1000.0)
+        tag.update_position(10.5, 10.0, 'excellent', 4, 1000.033)
+        self.assertEqual(tag.update_count, 1)
+        self.assertEqual(tag.last_update, 1000.033)
+
+
+class TestTickPipeline(unittest.TestCase):
+
+    def setUp(self):
+        for tag in uwb.tags.values():
+            tag.reset()
+
+    @staticmethod
+    def _fix(tag_id, x, y, now):
+        return (tag_id, x, y, 'excellent', 4, [], now, False)
+
+    def test_tick_applies_one_tags_fixes_in_order(self):
+        # one tick holding three fixes for tag 0 interleaved with tag 1
+        fixes = [self._fix(0, 10.0, 10.0, 1000.00), self._fix(1, 50.0, 50.0, 1000.01),
+                 self._fix(0, 30.0, 10.0, 1000.02), self._fix(0, 60.0, 10.0, 1000.04)]
+        rounds = uwb.split_rounds(fixes)
+        self.assertEqual([[f[0] for f in r] for r in rounds], [[0, 1], [0], [0]])
+
+        ref = uwb.TagState(0)
+        for f in fixes:
+            if f[0] == 0:
+                ref.update_position(f[1], f[2], f[3], f[4], f[6])
+        for r in rounds:
+            uwb.filter_round(r)
+        tag = uwb.tags[0]
+        self.assertEqual(tag.update_count, 3)
+        self.assertEqual((tag.raw_x, tag.last_update), (60.0, 1000.04))
+        self.assertEqual((tag.x, tag.y, tag.speed_cms), (ref.x, ref.y, ref.speed_cms))
+
+    def test_batch_step_matches_per_tag_update(self):
+        rng = random.Random(7)
+        bank = uwb.BatchKalman(3)
+        single = [uwb.KalmanFilter() for _ in range(3)]
+        for _ in range(200):
+            ids = rng.sample(range(3), rng.randint(1, 3))
+            mx = [rng.uniform(0, 300) for _ in ids]
+            my = [rng.uniform(0, 300) for _ in ids]
+            dt = [rng.uniform(0.001, 0.1) for _ in ids]
+            got = bank.step(ids, mx, my, dt).tolist()
+            want = [list(single[i].update(x, y, d)) for i, x, y, d in zip(ids, mx, my, dt)]
+            self.assertEqual(got, want)
+
+
+if __name__ == '__main__':
+    unittest.main()
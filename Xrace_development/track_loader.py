@@ -4,7 +4,7 @@ Supports tracks with visible width (inner and outer boundaries)
 """
 
 import csv
-import math
+import numpy as np
 from typing import List, Tuple
 
 
@@ -26,6 +26,10 @@ class Track:
         self.inner_points = inner_points if inner_points else []
         self.closed = True
         
+        # (N, 2) array view of the outer boundary for vectorised geometry
+        self._outer_np = np.asarray(outer_points, dtype=np.float64).reshape(-1, 2)
+        self._length = None
+        
     def get_points(self):
         """Get outer boundary points for compatibility"""
         return self.outer_points
@@ -43,37 +47,55 @@ class Track:
         return len(self.inner_points) > 0
     
     def get_track_length(self):
-        """Calculate track length (using outer boundary)"""
-        length = 0
-        points = self.outer_points
-        for i in range(len(points)):
-            p1 = points[i]
-            p2 = points[(i + 1) % len(points)]
-            length += math.sqrt((p2[0] - p1[0])**2 + (p2[1] - p1[1])**2)
-        return length
+        """Calculate track length (using outer boundary, closed loop)"""
+        if self._length is None:
+            pts = self._outer_np
+            if len(pts) == 0:
+                self._length = 0.0
+            else:
+                dx = np.diff(pts[:, 0], append=pts[0, 0])
+                dy = np.diff(pts[:, 1], append=pts[0, 1])
+                self._length = float(np.hypot(dx, dy).sum())
+        return self._length
 
 
 class TrackLoader:
     """Loads tracks from CSV files"""
     
+    @staticmethod
+    def _read_points(filename: str) -> List[Tuple[float, float]]:
+        """
+        Read x,y boundary points from a CSV file
+        
+        Parsed in one go by numpy.loadtxt; files with headers or malformed
+        rows fall back to the tolerant row-by-row reader.
+        """
+        try:
+            pts = np.loadtxt(filename, delimiter=',', comments='#',
+                             usecols=(0, 1), dtype=np.float64, ndmin=2)
+            return list(map(tuple, pts.tolist()))
+        except ValueError:
+            pass
+        
+        points = []
+        with open(filename, 'r') as f:
+            reader = csv.reader(f)
+            for row in reader:
+                if not row or row[0].startswith('#'):
+                    continue
+                try:
+                    x = float(row[0].strip())
+                    y = float(row[1].strip())
+                    points.append((x, y))
+                except (ValueError, IndexError):
+                    continue
+        return points
+    
     @staticmethod
     def load_from_csv(filename: str, track_name: str = None):
         """Load track outer boundary from CSV"""
-        points = []
-        
         try:
-            with open(filename, 'r') as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    if not row or row[0].startswith('#'):
-                        continue
-                    
-                    try:
-                        x = float(row[0].strip())
-                        y = float(row[1].strip())
-                        points.append((x, y))
-                    except (ValueError, IndexError):
-                        continue
+            points = TrackLoader._read_points(filename)
             
             if not track_name:
                 track_name = filename.split('/')[-1].split('\\')[-1].split('.')[0]
@@ -106,37 +128,15 @@ class TrackLoader:
             Track object with width
         """
         # Load outer boundary
-        outer_points = []
         try:
-            with open(outer_file, 'r') as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    if not row or row[0].startswith('#'):
-                        continue
-                    try:
-                        x = float(row[0].strip())
-                        y = float(row[1].strip())
-                        outer_points.append((x, y))
-                    except (ValueError, IndexError):
-                        continue
+            outer_points = TrackLoader._read_points(outer_file)
         except:
             print(f"✗ Could not load outer boundary: {outer_file}")
             return None
         
         # Load inner boundary
-        inner_points = []
         try:
-            with open(inner_file, 'r') as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    if not row or row[0].startswith('#'):
-                        continue
-                    try:
-                        x = float(row[0].strip())
-                        y = float(row[1].strip())
-                        inner_points.append((x, y))
-                    except (ValueError, IndexError):
-                        continue
+            inner_points = TrackLoader._read_points(inner_file)
         except:
             print(f"✗ Could not load inner boundary: {inner_file}")
             return None
@@ -167,22 +167,20 @@ class TrackLoader:
         Returns:
             Track with inner and outer boundaries
         """
-        outer_points = []
-        inner_points = []
+        # All angles at once; both boundaries share the same cos/sin
+        theta = np.linspace(0, 2 * np.pi, num_points, endpoint=False)
+        c = np.cos(theta)
+        s = np.sin(theta)
         
-        for i in range(num_points):
-            angle = 2 * math.pi * i / num_points
-            
-            # Outer boundary
-            x_outer = center_x + width * math.cos(angle)
-            y_outer = center_y + height * math.sin(angle)
-            outer_points.append((x_outer, y_outer))
-            
-            # Inner boundary (offset toward center)
-            scale = (width - track_width) / width
-            x_inner = center_x + (width - track_width) * math.cos(angle)
-            y_inner = center_y + (height - track_width) * math.sin(angle)
-            inner_points.append((x_inner, y_inner))
+        # Outer boundary
+        outer = np.column_stack((center_x + width * c, center_y + height * s))
+        
+        # Inner boundary (offset toward center)
+        inner = np.column_stack((center_x + (width - track_width) * c,
+                                 center_y + (height - track_width) * s))
+        
+        outer_points = list(map(tuple, outer.tolist()))
+        inner_points = list(map(tuple, inner.tolist()))
         
         print(f"✓ Created oval track (width={track_width}cm)")
         return Track("Oval Track", outer_points, inner_points)
@@ -19,20 +19,33 @@ Includes:
 import asyncio
 import websockets
 import socket
+import select
 import json
+import orjson
 import math
+import bisect
+import itertools
 import time
 import threading
 import signal
 import sys
+import numpy as np
 from datetime import datetime
 from collections import defaultdict, deque
+from jit_support import njit
+
+try:
+    import uvloop
+except ImportError:   # optional (not available on Windows)
+    uvloop = None
 
 # ═══════════════════════════════════════════════════════════════════════════
 # CONFIGURATION  (mirrors config.py + race_config.py)
 # ═══════════════════════════════════════════════════════════════════════════
 UDP_PORT = 4210
 WS_PORT  = 8001
+TICK_MAX_PACKETS = 64   # datagrams drained per receive tick before broadcasting
+WS_QUEUE_MAX = 100   # per-client outbound frames before the client is disconnected
 
 # Anchor physical positions (cm)
 ANCHOR_POSITIONS = {
@@ -48,6 +61,12 @@ TAG_COUNT    = 3
 KALMAN_PROCESS_NOISE     = 0.1
 KALMAN_MEASUREMENT_NOISE = 5.0
 
+# Stationary gate: raw fixes closer than this to the last filtered one are
+# treated as a parked tag and skip the filter, for at most STATIONARY_COAST s
+STATIONARY_EPS_CM = 2.0
+STATIONARY_COAST  = 0.5
+_STATIONARY_EPS_SQ = STATIONARY_EPS_CM * STATIONARY_EPS_CM
+
 # RSSI weighting
 RSSI_EXCELLENT    = -60
 RSSI_POOR         = -90
@@ -102,6 +121,9 @@ MAX_PLAUSIBLE_SPEED_CM_S  = 278
 # Speed
 SPEED_AVERAGE_SAMPLES = 10
 SPEED_DISPLAY_UNIT    = 'km/h'
+_CMS_TO_KMH   = 0.036
+# cm/s -> SPEED_DISPLAY_UNIT, resolved once instead of per call
+_SPEED_FACTOR = {'km/h': _CMS_TO_KMH, 'm/s': 0.01}.get(SPEED_DISPLAY_UNIT, 1.0)
 
 # Print flags
 PRINT_LAP_EVENTS       = True
@@ -112,78 +134,236 @@ PRINT_ANOMALIES        = True
 # ═══════════════════════════════════════════════════════════════════════════
 # KALMAN FILTER
 # ═══════════════════════════════════════════════════════════════════════════
-class KalmanFilter:
-    def __init__(self):
-        self.x = self.y = 0.0
-        self.prev_x = self.prev_y = 0.0
-        self.vx = self.vy = 0.0
-        self.initialized = False
+class BatchKalman:
+    """
+    (x, y, vx, vy) of every tag in one (n_tags, 4) float64 array.
+    step() filters any set of distinct tags in one vectorised predict/correct;
+    filter(i) hands out a per-tag KalmanFilter working on row i in place.
+    """
+    def __init__(self, n_tags):
+        self.state       = np.zeros((n_tags, 4))
+        self.initialized = np.zeros(n_tags, dtype=bool)
         self.q = KALMAN_PROCESS_NOISE
         self.r = KALMAN_MEASUREMENT_NOISE
+        self.k = self.r / (self.r + self.q)   # constant Kalman gain
+
+    def filter(self, i):
+        return KalmanFilter(self, i)
+
+    def step(self, ids, mx, my, dt):
+        """Update tags `ids` (distinct) with measurements mx, my; returns (m, 2) positions."""
+        ids  = np.atleast_1d(ids)
+        meas = np.column_stack((mx, my)).astype(np.float64)
+        dt   = np.broadcast_to(np.asarray(dt, dtype=np.float64), ids.shape)[:, None]
+        s    = self.state[ids]
+        prev = s[:, :2]
+        pos  = prev + s[:, 2:] * dt               # predict
+        pos += self.k * (meas - pos)              # correct
+        vel  = np.where(dt > 0, (pos - prev) / np.where(dt > 0, dt, 1.0), s[:, 2:])
+        new  = ~self.initialized[ids]
+        pos[new] = meas[new]; vel[new] = 0.0      # first fix seeds the filter
+        self.state[ids, :2] = pos
+        self.state[ids, 2:] = vel
+        self.initialized[ids] = True
+        return pos
+
+    def reset(self):
+        self.state[:] = 0.0
+        self.initialized[:] = False
+
+
+class KalmanFilter:
+    """Per-tag view on a BatchKalman row, stepped by the _kf_step kernel."""
+    def __init__(self, bank=None, i=0):
+        self._bank = bank if bank is not None else BatchKalman(1)
+        self._i    = i
+        self.state = self._bank.state[i]      # view: updates land in the bank
+        self.q, self.r, self.k = self._bank.q, self._bank.r, self._bank.k
+
+    @property
+    def initialized(self):
+        return bool(self._bank.initialized[self._i])
+
+    @initialized.setter
+    def initialized(self, value):
+        self._bank.initialized[self._i] = value
+
+    @property
+    def x(self):  return self.state[0]
+    @property
+    def y(self):  return self.state[1]
+    @property
+    def vx(self): return self.state[2]
+    @property
+    def vy(self): return self.state[3]
 
     def update(self, mx, my, dt=0.03):
         if not self.initialized:
-            self.x, self.y = mx, my
-            self.prev_x, self.prev_y = mx, my
+            self.state[:] = mx, my, 0.0, 0.0
             self.initialized = True
             return mx, my
+        return _kf_step(self.state, float(mx), float(my), float(dt), self.k)
 
-        # Save previous for velocity
-        prev_x, prev_y = self.x, self.y
+    def get_speed(self):
+        return math.hypot(self.state[2], self.state[3])
 
-        # Predict
-        self.x += self.vx * dt
-        self.y += self.vy * dt
+    def reset(self):
+        self.state[:] = 0.0
+        self.initialized = False
 
-        # Kalman gain
-        k = self.r / (self.r + self.q)
 
-        # Correct
-        self.x = self.x + k * (mx - self.x)
-        self.y = self.y + k * (my - self.y)
+@njit(cache=True, fastmath=True)
+def _kf_step(state, mx, my, dt, k):
+    # Save previous for velocity
+    prev_x = state[0]; prev_y = state[1]
 
-        # Velocity from corrected delta (fixed: use previous corrected position)
-        if dt > 0:
-            self.vx = (self.x - prev_x) / dt
-            self.vy = (self.y - prev_y) / dt
+    # Predict
+    x = prev_x + state[2] * dt
+    y = prev_y + state[3] * dt
 
-        return self.x, self.y
+    # Correct
+    x = x + k * (mx - x)
+    y = y + k * (my - y)
 
-    def get_speed(self):
-        return math.hypot(self.vx, self.vy)
+    # Velocity from corrected delta (fixed: use previous corrected position)
+    if dt > 0:
+        state[2] = (x - prev_x) / dt
+        state[3] = (y - prev_y) / dt
 
-    def reset(self):
-        self.x = self.y = self.vx = self.vy = 0.0
-        self.initialized = False
+    state[0] = x; state[1] = y
+    return x, y
 
 # ═══════════════════════════════════════════════════════════════════════════
 # POSITIONING  (trilateration + multilateration)
 # ═══════════════════════════════════════════════════════════════════════════
+_COMBO_IDX = {}   # n anchors -> (C(n,3), 3) index array
+
+def _combo_index(n):
+    idx = _COMBO_IDX.get(n)
+    if idx is None:
+        idx = _COMBO_IDX[n] = np.array(list(itertools.combinations(range(n), 3)),
+                                       dtype=np.intp)
+    return idx
+
+# RSSI weight for every whole dBm in [-128, 127], indexed by rssi + 128
+_RSSI_DBM    = np.arange(-128, 128)
+_RSSI_LUT_NP = np.where(
+    _RSSI_DBM >= 0, 1.0,
+    np.maximum(RSSI_MIN_WEIGHT,
+               1.0 + (_RSSI_DBM + (RSSI_EXCELLENT + RSSI_POOR) / 2) / RSSI_NORMALIZATION),
+)
+
+# ANCHOR_POSITIONS as one (ANCHOR_COUNT, 2) array; NaN rows for missing ids
+_ANCHOR_POS_ARR = np.array([ANCHOR_POSITIONS.get(i, (np.nan, np.nan))
+                            for i in range(ANCHOR_COUNT)], dtype=np.float64)
+
+
+# 3-anchor trilateration with the anchor geometry folded in as literals,
+# generated once per ordered anchor triple (see _trilaterator)
+_TRI_FN = {}
+
+_TRI_SRC = """\
+def _tri(r1, r2, r3):
+    C = r1*r1 - r2*r2 + {k12!r}
+    F = r2*r2 - r3*r3 + {k23!r}
+    return (C*{E!r} - F*{B!r}) / {denom!r}, (F*{A!r} - C*{D!r}) / {denom!r}
+"""
+
+_TRI_SRC_COLLINEAR = """\
+def _tri(r1, r2, r3):
+    # collinear fallback: two-circle midpoint
+    ratio = r1 / (r1 + r2) if (r1+r2) > 0 else 0.5
+    return {x1!r} + {dx!r}*ratio, {y1!r} + {dy!r}*ratio
+"""
+
+
+def _trilaterator(x1, y1, x2, y2, x3, y3):
+    """
+    3-anchor trilateration for fixed anchors: f(r1, r2, r3) -> (x, y).
+    Linearised circle intersection; collinear anchors fall back to the
+    two-circle midpoint.
+    """
+    key = (x1, y1, x2, y2, x3, y3)
+    fn = _TRI_FN.get(key)
+    if fn is not None:
+        return fn
+    A = 2*(x2-x1);  B = 2*(y2-y1)
+    D = 2*(x3-x2);  E = 2*(y3-y2)
+    denom = A*E - B*D
+    if abs(denom) >= 0.001:
+        src = _TRI_SRC.format(k12=-x1**2 + x2**2 - y1**2 + y2**2,
+                              k23=-x2**2 + x3**2 - y2**2 + y3**2,
+                              A=A, B=B, D=D, E=E, denom=denom)
+    elif x1 == x2 and y1 == y2:
+        src = f"def _tri(r1, r2, r3):\n    return {x1!r}, {y1!r}\n"
+    else:
+        src = _TRI_SRC_COLLINEAR.format(x1=x1, y1=y1, dx=x2-x1, dy=y2-y1)
+    ns = {}
+    exec(compile(src, f"<trilaterate {key}>", "exec"), ns)
+    fn = _TRI_FN[key] = ns['_tri']
+    return fn
+
+
+for _p, _q, _r in itertools.permutations(
+        [tuple(map(float, ANCHOR_POSITIONS[i])) for i in sorted(ANCHOR_POSITIONS)], 3):
+    _trilaterator(*_p, *_q, *_r)
+
+
+class ValidAnchors:
+    """Anchors with a usable range, as parallel arrays: row i is anchor ids[i]."""
+    __slots__ = ('ids', 'ranges', 'rssi', 'weights', 'pos')
+
+    def __init__(self, ids, ranges, rssi, weights, pos):
+        self.ids     = ids       # int32 anchor ids
+        self.ranges  = ranges    # float64 cm
+        self.rssi    = rssi      # float64 dBm
+        self.weights = weights   # float64
+        self.pos     = pos       # float64 (n, 2) anchor x, y
+
+    def __len__(self):
+        return len(self.ids)
+
+
 class Positioning:
     @staticmethod
-    def rssi_weight(rssi):
-        if rssi >= 0:
-            return 1.0
-        normalized = (rssi + (RSSI_EXCELLENT + RSSI_POOR) / 2) / RSSI_NORMALIZATION
-        return max(RSSI_MIN_WEIGHT, 1.0 + normalized)
+    def rssi_weights(rssi):
+        """RSSI (dBm) -> range weight, over a float64 array."""
+        w = np.maximum(RSSI_MIN_WEIGHT,
+                       1.0 + (rssi + (RSSI_EXCELLENT + RSSI_POOR) / 2) / RSSI_NORMALIZATION)
+        return np.where(rssi >= 0, 1.0, w)
 
     @staticmethod
     def get_valid_anchors(ranges, rssi_list, anchor_positions):
-        valid = []
-        for i, r in enumerate(ranges):
-            if r > 0 and i in anchor_positions:
-                rssi = rssi_list[i] if i < len(rssi_list) else 0
-                w    = Positioning.rssi_weight(rssi)
-                ax, ay = anchor_positions[i]
-                valid.append({'id': i, 'range': r, 'rssi': rssi,
-                              'weight': w, 'x': ax, 'y': ay})
-        return valid
+        n = len(ranges)
+        if anchor_positions is ANCHOR_POSITIONS and n <= ANCHOR_COUNT:
+            pos = _ANCHOR_POS_ARR[:n]
+        else:
+            pos = np.array([anchor_positions.get(i, (np.nan, np.nan)) for i in range(n)],
+                           dtype=np.float64).reshape(n, 2)
+        r = np.asarray(ranges, dtype=np.float64)
+        rssi = np.zeros(n)
+        m = min(n, len(rssi_list))
+        rssi[:m] = rssi_list[:m]
+
+        ids = np.flatnonzero((r > 0) & ~np.isnan(pos[:, 0]))
+        rssi = rssi[ids]
+        whole = rssi.astype(np.intp)
+        if np.array_equal(whole, rssi) and ((whole >= -128) & (whole < 128)).all():
+            weights = _RSSI_LUT_NP[whole + 128]
+        else:
+            weights = Positioning.rssi_weights(rssi)
+        return ValidAnchors(ids.astype(np.int32), r[ids], rssi, weights, pos[ids])
 
     @staticmethod
-    def trilaterate_3(a1, a2, a3):
-        x1,y1,r1 = a1['x'], a1['y'], a1['range']
-        x2,y2,r2 = a2['x'], a2['y'], a2['range']
-        x3,y3,r3 = a3['x'], a3['y'], a3['range']
+    def weighted_multilateration(valid):
+        n = len(valid)
+        if n < 3:
+            return None
+        # every 3-anchor combination solved at once, one row per triple
+        idx = _combo_index(n)
+        X = valid.pos[:, 0][idx]; Y = valid.pos[:, 1][idx]
+        R = valid.ranges[idx];    W = valid.weights[idx]
+        x1, x2, x3 = X.T; y1, y2, y3 = Y.T; r1, r2, r3 = R.T
 
         A = 2*(x2-x1);  B = 2*(y2-y1)
         C = r1**2 - r2**2 - x1**2 + x2**2 - y1**2 + y2**2
@@ -191,73 +371,83 @@ class Positioning:
         F = r2**2 - r3**2 - x2**2 + x3**2 - y2**2 + y3**2
 
         denom = A*E - B*D
-        if abs(denom) < 0.001:
-            # collinear fallback: two-circle midpoint
-            d = math.hypot(x2-x1, y2-y1)
-            if d == 0: return x1, y1
-            ratio = r1 / (r1 + r2) if (r1+r2) > 0 else 0.5
-            return x1+(x2-x1)*ratio, y1+(y2-y1)*ratio
-
-        x = (C*E - F*B) / denom
-        y = (A*F - C*D) / denom
-        return x, y
+        ok = np.abs(denom) >= 0.001
+        safe = np.where(ok, denom, 1.0)
+        px = (C*E - F*B) / safe
+        py = (A*F - C*D) / safe
+        if not ok.all():
+            # collinear fallback: two-circle midpoint (coincident anchors -> x1,y1)
+            rs = r1 + r2
+            ratio = np.where(rs > 0, r1 / np.where(rs > 0, rs, 1.0), 0.5)
+            px = np.where(ok, px, x1+(x2-x1)*ratio)
+            py = np.where(ok, py, y1+(y2-y1)*ratio)
+
+        w = W.mean(axis=1)
+        tw = w.sum()
+        if tw <= 0:
+            return None
+        x, y = (np.stack((px, py)) @ w) / tw
+        return float(x), float(y)
 
     @staticmethod
-    def weighted_multilateration(valid):
+    def lsq_multilateration(valid):
+        """
+        Weighted least squares over the range equations linearised against the
+        strongest anchor: one 2×2 normal-equation solve in closed form instead
+        of averaging every 3-anchor solution. Falls back to
+        weighted_multilateration when the anchors are collinear.
+        """
         if len(valid) < 3:
             return None
-        combos = []
-        n = len(valid)
-        for i in range(n):
-            for j in range(i+1, n):
-                for k in range(j+1, n):
-                    a1, a2, a3 = valid[i], valid[j], valid[k]
-                    px, py = Positioning.trilaterate_3(a1, a2, a3)
-                    w = (a1['weight'] + a2['weight'] + a3['weight']) / 3
-                    combos.append((px, py, w))
-        if not combos:
-            return None
-        tw = sum(c[2] for c in combos)
-        if tw <= 0:
-            return None
-        x = sum(c[0]*c[2] for c in combos) / tw
-        y = sum(c[1]*c[2] for c in combos) / tw
-        return x, y
+        pos, r, w = valid.pos, valid.ranges, valid.weights
+        ref = int(np.argmax(w))
+        p0 = pos[ref]
+        a  = 2*(pos - p0)                                   # rows (ax, ay); ref row is 0
+        b  = r[ref]**2 - r**2 - p0 @ p0 + np.einsum('ij,ij->i', pos, pos)
+        wa = a * w[:, None]
+        (sxx, sxy), (_, syy) = wa.T @ a
+        sxb, syb = wa.T @ b
+        det = sxx*syy - sxy*sxy
+        if abs(det) <= 1e-9 * sxx * syy or det == 0:
+            return Positioning.weighted_multilateration(valid)
+        return float((syy*sxb - sxy*syb) / det), float((sxx*syb - sxy*sxb) / det)
 
     @staticmethod
     def calculate(ranges, rssi_list, anchor_positions):
         valid = Positioning.get_valid_anchors(ranges, rssi_list, anchor_positions)
-        if len(valid) >= QUALITY_EXCELLENT_ANCHORS:
-            pos = Positioning.weighted_multilateration(valid)
+        n = len(valid)
+        if n >= QUALITY_EXCELLENT_ANCHORS:
+            pos = Positioning.lsq_multilateration(valid)
             quality = 'excellent'
-        elif len(valid) >= QUALITY_GOOD_ANCHORS:
-            valid.sort(key=lambda a: a['weight'], reverse=True)
-            pos = Positioning.trilaterate_3(valid[0], valid[1], valid[2])
+        elif n >= QUALITY_GOOD_ANCHORS:
+            top = np.argsort(-valid.weights, kind='stable')[:3]
+            (x1, y1), (x2, y2), (x3, y3) = valid.pos[top].tolist()
+            pos = _trilaterator(x1, y1, x2, y2, x3, y3)(*valid.ranges[top].tolist())
             quality = 'good'
-        elif len(valid) >= 2:
-            a1, a2 = valid[0], valid[1]
-            d = math.hypot(a2['x']-a1['x'], a2['y']-a1['y'])
+        elif n >= 2:
+            (x1, y1), (x2, y2) = valid.pos[:2].tolist()
+            r1, r2 = valid.ranges[:2].tolist()
+            d = math.hypot(x2-x1, y2-y1)
             if d == 0:
-                pos = (a1['x'], a1['y'])
+                pos = (x1, y1)
             else:
-                ratio = a1['range'] / (a1['range'] + a2['range'])
-                pos = (a1['x']+(a2['x']-a1['x'])*ratio,
-                       a1['y']+(a2['y']-a1['y'])*ratio)
+                ratio = r1 / (r1 + r2)
+                pos = (x1+(x2-x1)*ratio, y1+(y2-y1)*ratio)
             quality = 'fair'
         else:
-            return None, 'poor', len(valid)
+            return None, 'poor', n
 
         # pos may be a tuple or None
         if pos is None:
-            return None, quality, len(valid)
+            return None, quality, n
         px, py = pos if isinstance(pos, tuple) else (pos[0], pos[1])
-        return (px, py), quality, len(valid)
+        return (px, py), quality, n
 
 # ═══════════════════════════════════════════════════════════════════════════
 # TAG STATE  (position, kalman, trail, speed)
 # ═══════════════════════════════════════════════════════════════════════════
 class TagState:
-    def __init__(self, tag_id):
+    def __init__(self, tag_id, kf_bank=None):
         self.id          = tag_id
         self.name        = f"Car{tag_id}"
         self.x           = 0.0
@@ -266,54 +456,93 @@ class TagState:
         self.raw_y       = 0.0
         self.status      = False
         self.last_update = 0.0
+        self._filtered_at = 0.0
         self.quality     = 'unknown'
         self.anchor_count = 0
-        self.kalman      = KalmanFilter()
-        self.history     = deque(maxlen=TRAIL_LENGTH)
+        self.kalman      = kf_bank.filter(tag_id) if kf_bank else KalmanFilter()
+        # trail: preallocated (x, y) ring buffer, see `history`
+        self._hist       = np.zeros((TRAIL_LENGTH, 2), dtype=np.float32)
+        self._hist_n     = 0
+        self._hist_head  = 0
         self.update_count = 0
 
         # Speed tracking
-        self._pos_buf    = deque(maxlen=SPEED_AVERAGE_SAMPLES)
+        # (x, y, t) ring buffer, newest row at _pos_head - 1
+        self._pos_ring   = np.empty((SPEED_AVERAGE_SAMPLES, 3), dtype=np.float64)
+        self._pos_head   = 0
+        self._pos_n      = 0
         self.speed_cms   = 0.0
         self.max_speed   = 0.0
 
     def update_position(self, raw_x, raw_y, quality, anchor_count, now):
-        dt = now - self.last_update if self.last_update else 0.033
-        dt = max(0.001, min(dt, 1.0))   # clamp
+        dt = self.gate(raw_x, raw_y, quality, anchor_count, now)
+        if dt is not None:
+            x, y = self.kalman.update(raw_x, raw_y, dt)
+            self.apply_fix(x, y, raw_x, raw_y, now)
+
+    def gate(self, raw_x, raw_y, quality, anchor_count, now,
+             _eps_sq=_STATIONARY_EPS_SQ, _coast=STATIONARY_COAST):
+        """Refresh liveness; return the Kalman dt for this fix, or None if gated."""
+        # (underscore defaults: per-packet constants bound as fast locals)
+        self.quality      = quality
+        self.anchor_count = anchor_count
+        self.status       = True
+        self.last_update  = now
+
+        # Parked tag: keep it alive but skip the filter / trail / speed work
+        dx, dy = raw_x - self.raw_x, raw_y - self.raw_y
+        if (self.kalman.initialized and dx*dx + dy*dy < _eps_sq
+                and now - self._filtered_at < _coast):
+            return None
+
+        # time since the last *filtered* fix: gated packets don't advance it
+        dt = now - self._filtered_at if self._filtered_at else 0.033
+        return max(0.001, min(dt, 1.0))   # clamp
 
+    def apply_fix(self, x, y, raw_x, raw_y, now,
+                  _trail=TRAIL_LENGTH, _samples=SPEED_AVERAGE_SAMPLES,
+                  _hypot=math.hypot):
+        """Record a filtered position: trail, speed and the gate's reference."""
         self.raw_x, self.raw_y = raw_x, raw_y
-        self.x, self.y = self.kalman.update(raw_x, raw_y, dt)
-        self.quality        = quality
-        self.anchor_count   = anchor_count
-        self.status         = True
-        self.last_update    = now
-        self.history.append((self.x, self.y, now))
+        self.x, self.y      = x, y
+        self._filtered_at   = now
+        self._hist[self._hist_head] = (x, y)
+        self._hist_head = (self._hist_head + 1) % _trail
+        self._hist_n    = min(self._hist_n + 1, _trail)
         self.update_count  += 1
 
-        # Speed
-        self._pos_buf.append({'x': self.x, 'y': self.y, 't': now})
-        if len(self._pos_buf) >= 2:
-            p1, p2 = self._pos_buf[-2], self._pos_buf[-1]
-            ddt = p2['t'] - p1['t']
+        # Speed: previous sample vs this one (h - 1 wraps to the last row)
+        ring, h = self._pos_ring, self._pos_head
+        if self._pos_n:
+            x1, y1, t1 = ring[h - 1]
+            ddt = now - t1
             if ddt > 0:
-                dist = math.hypot(p2['x']-p1['x'], p2['y']-p1['y'])
+                dist = _hypot(x - x1, y - y1)
                 self.speed_cms = dist / ddt
                 self.max_speed = max(self.max_speed, self.speed_cms)
+        ring[h] = x, y, now
+        self._pos_head = (h + 1) % _samples
+        self._pos_n    = min(self._pos_n + 1, _samples)
 
-    def speed_display(self):
-        if SPEED_DISPLAY_UNIT == 'km/h':
-            return self.speed_cms * 0.036
-        if SPEED_DISPLAY_UNIT == 'm/s':
-            return self.speed_cms / 100
-        return self.speed_cms
+    @property
+    def history(self):
+        """Trail samples oldest→newest as an (n, 2) float32 array."""
+        if self._hist_n < TRAIL_LENGTH:
+            return self._hist[:self._hist_n]
+        h = self._hist_head
+        return np.concatenate((self._hist[h:], self._hist[:h]))
+
+    def speed_display(self, _factor=_SPEED_FACTOR):
+        return self.speed_cms * _factor
 
     def is_active(self):
         return self.status and (time.time() - self.last_update) < TAG_TIMEOUT
 
     def reset(self):
         self.kalman.reset()
-        self.history.clear()
-        self._pos_buf.clear()
+        self._hist_n = self._hist_head = 0
+        self._pos_n = self._pos_head = 0
+        self._filtered_at = 0.0
         self.speed_cms  = 0.0
         self.max_speed  = 0.0
         self.status     = False
@@ -360,16 +589,19 @@ class LapScore:
         self.corner_cuts += 1
         if CORNER_CUT_VOID_LAP:
             self.voided = True
-            print(f"  ⛔ VOID  | {self.car_name} Lap {self.lap_number}")
+            if PRINT_LAP_EVENTS:
+                print(f"  ⛔ VOID  | {self.car_name} Lap {self.lap_number}")
         else:
             self._pen += CORNER_CUT_PENALTY
-            print(f"  🔶 CUT   | {self.car_name} Lap {self.lap_number} +{CORNER_CUT_PENALTY}s")
+            if PRINT_LAP_EVENTS:
+                print(f"  🔶 CUT   | {self.car_name} Lap {self.lap_number} +{CORNER_CUT_PENALTY}s")
 
     def add_overspeed(self):
         if not self.overspeed:
             self.overspeed = True
             self._pen     += PIT_ZONE_OVERSPEED_PENALTY
-            print(f"  🚨 SPD   | {self.car_name} Lap {self.lap_number} +{PIT_ZONE_OVERSPEED_PENALTY}s")
+            if PRINT_LAP_EVENTS:
+                print(f"  🚨 SPD   | {self.car_name} Lap {self.lap_number} +{PIT_ZONE_OVERSPEED_PENALTY}s")
 
     @property
     def elp(self):
@@ -388,20 +620,27 @@ class ScoringEngine:
         self._open    = {}
         self._names   = {}
         self._feed    = []
+        # leaderboard, maintained as laps close (closed laps never change)
+        self._best    = {}                                # car_id -> best valid LapScore
+        self._order   = []                                # sorted (elp, lap, seq, car_id) of _best
+        self._seq     = {}                                # car_id -> order of its first closed lap
+        self._totals  = defaultdict(lambda: [0.0, 0.0])   # car_id -> [penalties, bonuses]
 
     def register(self, car_id, car_name):
         self._names[car_id] = car_name
 
     def open_lap(self, car_id, lap_number):
-        self._open[car_id] = LapScore(car_id, self._names.get(car_id, f"Car{car_id}"), lap_number)
+        self._open[car_id] = LapScore(car_id, (self._names.get(car_id) or f"Car{car_id}"), lap_number)
 
     def close_lap(self, car_id, raw_time):
         lap = self._open.pop(car_id, None)
         if lap is None:
-            lap = LapScore(car_id, self._names.get(car_id, f"Car{car_id}"), 0)
+            lap = LapScore(car_id, (self._names.get(car_id) or f"Car{car_id}"), 0)
         lap.raw_time  = raw_time
         lap.closed_at = time.time()
         self._history[car_id].append(lap)
+        self._seq.setdefault(car_id, len(self._seq))
+        self._rank(car_id, lap)
         msg = (f"📊 LAP | {lap.car_name} Lap {lap.lap_number} "
                f"raw={raw_time:.2f}s ELP={lap.elp:.2f}s")
         if PRINT_LAP_EVENTS:
@@ -409,6 +648,20 @@ class ScoringEngine:
         self._feed.append(msg)
         return lap
 
+    def _rank(self, car_id, lap):
+        tot = self._totals[car_id]
+        tot[0] += lap._pen; tot[1] += lap._bon
+        if lap.voided: return
+        old = self._best.get(car_id)
+        # equal times rank in the order the cars first closed a lap
+        seq = self._seq[car_id]
+        if old is not None:
+            if lap.elp >= old.elp: return   # ties keep the earlier lap
+            del self._order[bisect.bisect_left(
+                self._order, (round(old.elp, 3), old.lap_number, seq, car_id))]
+        bisect.insort(self._order, (round(lap.elp, 3), lap.lap_number, seq, car_id))
+        self._best[car_id] = lap
+
     def current_lap(self, car_id):
         return self._open.get(car_id)
 
@@ -436,8 +689,8 @@ class ScoringEngine:
         if lap: lap.add_overspeed()
 
     def best_elp(self, car_id):
-        valid = [l.elp for l in self._history.get(car_id, []) if not l.voided]
-        return min(valid) if valid else float('inf')
+        best = self._best.get(car_id)
+        return best.elp if best else float('inf')
 
     def laps_done(self, car_id):
         return len(self._history.get(car_id, []))
@@ -447,26 +700,23 @@ class ScoringEngine:
 
     def get_leaderboard(self):
         rows = []
-        for cid, laps in self._history.items():
-            valid = [l for l in laps if not l.voided]
-            if not valid: continue
-            best = min(valid, key=lambda l: (l.elp, l.closed_at or 0))
+        for elp, lap_no, _, cid in self._order:
+            best = self._best[cid]; n = len(self._history[cid]); pen, bon = self._totals[cid]
             rows.append(dict(
-                car_id=cid, car_name=self._names.get(cid, f"Car{cid}"),
-                best_elp=round(best.elp, 3), best_raw=round(best.raw_time, 3),
-                best_lap=best.lap_number, laps_done=len(laps),
-                qualifies=self.qualifies(cid),
-                penalty_total=round(sum(l._pen for l in laps), 2),
-                bonus_total=round(sum(l._bon for l in laps), 2)
+                car_id=cid, car_name=(self._names.get(cid) or f"Car{cid}"),
+                best_elp=elp, best_raw=round(best.raw_time, 3),
+                best_lap=lap_no, laps_done=n,
+                qualifies=n >= MIN_LAPS_TO_QUALIFY,
+                penalty_total=round(pen, 2),
+                bonus_total=round(bon, 2)
             ))
-        rows.sort(key=lambda r: (r['best_elp'], r['best_lap']))
         return rows
 
     def get_car_summary(self, car_id):
         laps = self._history.get(car_id, [])
         op   = self._open.get(car_id)
         return dict(car_id=car_id,
-                    car_name=self._names.get(car_id, f"Car{car_id}"),
+                    car_name=(self._names.get(car_id) or f"Car{car_id}"),
                     laps_done=len(laps),
                     best_elp=self.best_elp(car_id),
                     qualifies=self.qualifies(car_id),
@@ -480,6 +730,7 @@ class ScoringEngine:
         self._history.clear()
         self._open.clear()
         self._feed.clear()
+        self._best.clear(); self._order.clear(); self._totals.clear(); self._seq.clear()
         print("📊 Scoring engine reset")
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -490,6 +741,9 @@ class Track:
         self.name         = "Oval Track"
         self.outer_points = outer_points
         self.inner_points = inner_points or []
+        # static per-segment tables for wall checks, built once
+        self._outer       = BoundaryIndex(self.outer_points)
+        self._inner       = BoundaryIndex(self.inner_points)
 
     def has_width(self):
         return len(self.inner_points) > 0
@@ -500,34 +754,88 @@ class Track:
     def get_inner_points(self):
         return self.inner_points
 
+    def wall_distances(self, px, py):
+        """(outer, inner) distance; exact up to WALL_TOLERANCE_CM, see BoundaryIndex."""
+        return self._outer.dist(px, py), self._inner.dist(px, py)
+
 
 def create_oval_track(cx=100, cy=110, ow=85, oh=70, tw=30, n=40):
-    outer, inner = [], []
-    for i in range(n):
-        angle = 2 * math.pi * i / n
-        outer.append((cx + ow * math.cos(angle), cy + oh * math.sin(angle)))
-        inner.append((cx + (ow-tw) * math.cos(angle), cy + (oh-tw) * math.sin(angle)))
-    return Track(outer, inner)
-
-
-def dist_to_boundary(px, py, pts):
-    """Minimum distance from point to a closed polygon boundary."""
-    if not pts or len(pts) < 2:
-        return float('inf')
-    best = float('inf')
-    n = len(pts)
-    for i in range(n):
-        x1, y1 = pts[i]
-        x2, y2 = pts[(i+1) % n]
-        dx, dy = x2-x1, y2-y1
-        denom = dx*dx + dy*dy
-        if denom == 0:
-            d = math.hypot(px-x1, py-y1)
-        else:
-            t = max(0, min(1, ((px-x1)*dx + (py-y1)*dy) / denom))
-            d = math.hypot(px - x1 - t*dx, py - y1 - t*dy)
-        best = min(best, d)
-    return best
+    theta = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    c, s = np.cos(theta), np.sin(theta)
+    outer = np.column_stack((cx + ow * c, cy + oh * s))
+    inner = np.column_stack((cx + (ow-tw) * c, cy + (oh-tw) * s))
+    return Track(list(map(tuple, outer.tolist())), list(map(tuple, inner.tolist())))
+
+
+class BoundaryIndex:
+    """
+    Closed polygon boundary with per-segment (x1, y1, dx, dy, 1/len²) rows and
+    angular buckets around the centroid, so a query only scans the segments
+    in the point's bucket. A segment is filed under every bucket its arc,
+    widened by the angle `pad` subtends at its closest approach to the
+    centroid, overlaps: any segment within `pad` of the point is a candidate.
+    Distances up to `pad` are exact; anything farther is only guaranteed
+    to be > pad. Assumes the polygon is star-shaped about its centroid
+    (true for the oval).
+    """
+    BINS = 64
+
+    def __init__(self, pts, pad=WALL_TOLERANCE_CM):
+        self.seg = None
+        a = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+        if len(a) < 2:
+            return
+        xs, ys = a[:, 0], a[:, 1]
+        dx = np.roll(xs, -1) - xs
+        dy = np.roll(ys, -1) - ys
+        den = dx*dx + dy*dy
+        inv = np.divide(1.0, den, out=np.zeros_like(den), where=den > 0)
+        self.seg = np.column_stack((xs, ys, dx, dy, inv))
+        self.cx, self.cy = float(xs.mean()), float(ys.mean())
+        self._w = 2 * math.pi / self.BINS
+
+        # closest approach of each segment to the centroid
+        t = np.clip(((self.cx-xs)*dx + (self.cy-ys)*dy) * inv, 0.0, 1.0)
+        rc = np.hypot(xs + t*dx - self.cx, ys + t*dy - self.cy)
+        a0 = np.arctan2(ys - self.cy, xs - self.cx)
+        span = (np.arctan2(ys + dy - self.cy, xs + dx - self.cx) - a0 + math.pi) % (2*math.pi) - math.pi
+        margin = np.arcsin(np.minimum(1.0, pad / np.maximum(rc, 1e-9)))
+        lo = a0 + np.minimum(span, 0) - margin
+        hi = a0 + np.maximum(span, 0) + margin
+
+        buckets = [[] for _ in range(self.BINS)]
+        for i in range(len(xs)):
+            if rc[i] <= pad:
+                ks = range(self.BINS)
+            else:
+                ks = range(math.floor((lo[i] + math.pi) / self._w),
+                           math.floor((hi[i] + math.pi) / self._w) + 1)
+            for k in ks:
+                buckets[k % self.BINS].append(i)
+        self.buckets = [np.array(sorted(set(b)), dtype=np.intp) for b in buckets]
+
+    def dist(self, px, py):
+        if self.seg is None:
+            return float('inf')
+        k = int((math.atan2(py - self.cy, px - self.cx) + math.pi) / self._w) % self.BINS
+        return _segment_dist(float(px), float(py), self.seg, self.buckets[k])
+
+
+@njit(cache=True, fastmath=True)
+def _segment_dist(px, py, seg, idx):
+    """Minimum distance from point to the segments seg[idx] (inf if none)."""
+    best = np.inf
+    for m in range(idx.shape[0]):
+        i = idx[m]
+        x1 = seg[i, 0]; y1 = seg[i, 1]; dx = seg[i, 2]; dy = seg[i, 3]
+        ex = px - x1; ey = py - y1
+        t = (ex*dx + ey*dy) * seg[i, 4]
+        t = 0.0 if t < 0.0 else (1.0 if t > 1.0 else t)
+        ex -= t*dx; ey -= t*dy
+        d2 = ex*ex + ey*ey
+        if d2 < best:
+            best = d2
+    return math.sqrt(best)
 
 # ═══════════════════════════════════════════════════════════════════════════
 # LAP ENGINE  (per car)
@@ -618,16 +926,21 @@ class LapEngine:
                   f"raw={raw:.2f}s  ELP={lap_score.elp:.2f}s")
         return event
 
-    def _get_side(self, x, y):
-        if START_LINE_ORIENTATION == 'vertical':
+    # Start-line tests specialised once for START_LINE_ORIENTATION
+    if START_LINE_ORIENTATION == 'vertical':
+        def _get_side(self, x, y):
             return x < START_LINE_X
-        return y < START_LINE_Y1
 
-    def _within_bounds(self, x, y):
-        if START_LINE_ORIENTATION == 'vertical':
+        def _within_bounds(self, x, y):
             return START_LINE_Y1 <= y <= START_LINE_Y2
-        return (START_LINE_X - LINE_CROSSING_THRESHOLD <= x
-                <= START_LINE_X + LINE_CROSSING_THRESHOLD)
+    else:
+        def _get_side(self, x, y):
+            return y < START_LINE_Y1
+
+        def _within_bounds(self, x, y,
+                           _lo=START_LINE_X - LINE_CROSSING_THRESHOLD,
+                           _hi=START_LINE_X + LINE_CROSSING_THRESHOLD):
+            return _lo <= x <= _hi
 
     def _check_checkpoints(self, x, y):
         for idx, (cx, cy) in enumerate(CHECKPOINTS):
@@ -640,9 +953,10 @@ class LapEngine:
             if idx not in self._checkpoints:
                 self.scoring.corner_cut(self.car_id)
 
-    def _check_pit_speed(self, x, y, speed):
+    def _check_pit_speed(self, x, y, speed,
+                         _lo=START_LINE_X - 50, _hi=START_LINE_X + 50):
         if self.current_lap == 1:
-            near = (abs(x - START_LINE_X) < 50 and START_LINE_Y1 <= y <= START_LINE_Y2)
+            near = (_lo < x < _hi and START_LINE_Y1 <= y <= START_LINE_Y2)
             if near and speed > PIT_ZONE_MAX_SPEED_CM_S:
                 self.scoring.overspeed(self.car_id)
 
@@ -729,10 +1043,11 @@ class CollisionEngine:
         self._speeds   = {}
         self._laps     = {}
         self._racing   = {}
-        self._car_cd   = {}
+        self._car_cd   = {}   # (lo << 16 | hi) car pair -> last t
         self._wall_cd  = {}
         self._ghost_t  = {}
-        self._spd_buf  = []
+        self._spd_buf  = deque(maxlen=300)   # rolling speed samples
+        self._spd_sum  = 0.0                 # running sum of _spd_buf
         self.events    = []
         self.anomalies = []
 
@@ -749,16 +1064,21 @@ class CollisionEngine:
             self._racing[cid] = d.get('racing', False)
             spd = self._speeds[cid]
             if spd > 0:
-                self._spd_buf.append(spd)
-                if len(self._spd_buf) > 300:
-                    self._spd_buf.pop(0)
+                buf = self._spd_buf
+                if len(buf) == buf.maxlen:
+                    self._spd_sum -= buf[0]   # about to fall off the left
+                buf.append(spd)
+                self._spd_sum += spd
             if spd > MAX_PLAUSIBLE_SPEED_CM_S:
                 self._flag_anomaly(cid, spd, now)
 
         racing_ids = [c for c, d in cars.items() if d.get('racing', False)]
-        for i in range(len(racing_ids)):
-            for j in range(i+1, len(racing_ids)):
-                e = self._check_car(racing_ids[i], racing_ids[j], now)
+        if len(racing_ids) > 1:
+            # ghost timers tick for every racing car, near a rival or not
+            ghosts = {c for c in racing_ids if self._is_ghost(c)}
+            for a, b, dist in self._close_pairs(racing_ids):
+                if a in ghosts or b in ghosts: continue
+                e = self._check_car(a, b, dist, now)
                 if e: new_evts.append(e)
 
         for cid, d in cars.items():
@@ -769,15 +1089,17 @@ class CollisionEngine:
         self.events.extend(new_evts)
         return new_evts
 
-    def _check_car(self, a, b, now):
-        if self._is_ghost(a) or self._is_ghost(b): return None
-        pa = self._pos.get(a); pb = self._pos.get(b)
-        if not pa or not pb: return None
-
-        dist = math.hypot(pa[0]-pb[0], pa[1]-pb[1])
-        if dist > CAR_COLLISION_DISTANCE_CM: return None
-
-        key = frozenset([a, b])
+    def _close_pairs(self, ids):
+        """(a, b, dist) for car pairs within CAR_COLLISION_DISTANCE_CM, all pairs at once."""
+        pts  = np.array([self._pos[c][:2] for c in ids], dtype=np.float64)
+        diff = pts[:, None, :] - pts[None, :, :]
+        d2   = np.einsum('ijk,ijk->ij', diff, diff)
+        I, J = np.nonzero(np.triu(d2 <= CAR_COLLISION_DISTANCE_CM**2, k=1))
+        return [(ids[i], ids[j], math.sqrt(d2[i, j]))
+                for i, j in zip(I.tolist(), J.tolist())]
+
+    def _check_car(self, a, b, dist, now):
+        key = (a << 16 | b) if a < b else (b << 16 | a)   # unordered pair, small ids
         if now - self._car_cd.get(key, 0) < CAR_COLLISION_COOLDOWN: return None
         self._car_cd[key] = now
 
@@ -788,8 +1110,8 @@ class CollisionEngine:
             attacker, victim = a, b
 
         self.scoring.car_collision(attacker, victim)
-        an = self._names.get(attacker, f"Car{attacker}")
-        vn = self._names.get(victim,   f"Car{victim}")
+        an = self._names.get(attacker) or f"Car{attacker}"
+        vn = self._names.get(victim) or f"Car{victim}"
         lap = self._laps.get(attacker, 0)
 
         if PRINT_COLLISION_EVENTS:
@@ -802,8 +1124,7 @@ class CollisionEngine:
         if not self.track or not self.track.has_width(): return None
         if now - self._wall_cd.get(cid, 0) < WALL_COLLISION_COOLDOWN: return None
 
-        od = dist_to_boundary(x, y, self.track.get_outer_points())
-        id_ = dist_to_boundary(x, y, self.track.get_inner_points())
+        od, id_ = self.track.wall_distances(x, y)
 
         wall = None
         if od <= WALL_TOLERANCE_CM:   wall = 'outer'
@@ -812,7 +1133,7 @@ class CollisionEngine:
 
         self._wall_cd[cid] = now
         self.scoring.wall_hit(cid)
-        name = self._names.get(cid, f"Car{cid}")
+        name = self._names.get(cid) or f"Car{cid}"
         if PRINT_WALL_EVENTS:
             print(f"🚧 WALL | {name} hit {wall.upper()} wall  Lap{lap}")
 
@@ -821,7 +1142,7 @@ class CollisionEngine:
 
     def _is_ghost(self, cid):
         spd = self._speeds.get(cid, 0)
-        avg = sum(self._spd_buf)/len(self._spd_buf) if self._spd_buf else 1
+        avg = self._spd_sum/len(self._spd_buf) if self._spd_buf else 1
         thr = avg * GHOSTING_SPEED_THRESHOLD
         if spd < thr:
             if cid not in self._ghost_t:
@@ -833,10 +1154,10 @@ class CollisionEngine:
         return False
 
     def _flag_anomaly(self, cid, spd, now):
-        name = self._names.get(cid, f"Car{cid}")
+        name = self._names.get(cid) or f"Car{cid}"
         self.anomalies.append(dict(car_id=cid, name=name, speed=spd, time=now))
         if PRINT_ANOMALIES:
-            print(f"⚠️  ANOMALY | {name} speed={spd:.0f}cm/s ({spd*0.036:.1f}km/h)")
+            print(f"⚠️  ANOMALY | {name} speed={spd:.0f}cm/s ({spd*_CMS_TO_KMH:.1f}km/h)")
 
     def wall_hits(self, cid):
         return [e for e in self.events if e['type']=='wall' and e['car_id']==cid]
@@ -848,13 +1169,14 @@ class CollisionEngine:
     def reset(self):
         self.events.clear(); self.anomalies.clear()
         self._car_cd.clear(); self._wall_cd.clear()
-        self._ghost_t.clear(); self._spd_buf.clear()
+        self._ghost_t.clear(); self._spd_buf.clear(); self._spd_sum = 0.0
         print("✓ Collision engine reset")
 
 # ═══════════════════════════════════════════════════════════════════════════
 # GLOBAL SYSTEM STATE
 # ═══════════════════════════════════════════════════════════════════════════
-tags         = {i: TagState(i) for i in range(TAG_COUNT)}
+batch_kf     = BatchKalman(TAG_COUNT)   # all tags' filter state in one array
+tags         = {i: TagState(i, batch_kf) for i in range(TAG_COUNT)}
 anchors_info = ANCHOR_POSITIONS        # dict id -> (x,y)
 
 scoring  = ScoringEngine()
@@ -869,7 +1191,7 @@ for tid, tag in tags.items():
     col_eng.register(tid, name)
 
 # Bridge state
-connected_clients = set()
+connected_clients = set()               # ClientConn
 event_loop        = None
 running           = True
 
@@ -919,6 +1241,14 @@ def process_race_update(tag_id, now):
     return events_out
 
 
+_ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _dumps(content, _encode=orjson.dumps, _opts=_ORJSON_OPTS):
+    """Encode a frame once for all clients; str so it goes out as a text frame."""
+    return _encode(content, option=_opts).decode()
+
+
 def build_state_message(now):
     """Build full state JSON to broadcast to all WS clients."""
     cars = []
@@ -941,7 +1271,7 @@ def build_state_message(now):
             speed_cms=round(tag.speed_cms, 1),
             quality=tag.quality,
             anchor_count=tag.anchor_count,
-            trail=[(round(h[0],1), round(h[1],1)) for h in tag.history],
+            trail=tag.history.round(1),   # float32 rows, orjson encodes numpy directly
             lap_info=li,
             scoring=dict(
                 best_elp=sc['best_elp'] if sc['best_elp'] < float('inf') else None,
@@ -953,7 +1283,7 @@ def build_state_message(now):
             car_collisions=ce,
         ))
 
-    return json.dumps({
+    return _dumps({
         "type":        "state_update",
         "timestamp":   now,
         "race_active": race_mgr.race_active,
@@ -970,112 +1300,187 @@ def create_udp_socket():
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     sock.bind(('', UDP_PORT))
-    sock.settimeout(0.1)
+    sock.setblocking(False)   # udp_receiver waits in select, then drains
     return sock
 
 
-def udp_receiver():
-    global running
-    sock = create_udp_socket()
-    print(f"[UDP] ✓ Listening on port {UDP_PORT}")
+def locate_packet(data):
+    """
+    Parse and position one datagram.
+    Returns (tag_id, raw_x, raw_y, quality, anchor_count, ranges, now, log) or None;
+    log marks every 20th datagram, decided here while the count is per packet.
+    """
+    bridge_stats['udp_packets_total'] += 1
 
-    pkt = 0
-    while running:
-        try:
-            data, addr = sock.recvfrom(2048)
-            bridge_stats['udp_packets_total'] += 1
-            pkt += 1
+    message = data.decode('utf-8', errors='ignore').strip()
 
-            message = data.decode('utf-8', errors='ignore').strip()
+    try:
+        uwb = json.loads(message)
+    except json.JSONDecodeError:
+        return None
 
-            try:
-                uwb = json.loads(message)
-            except json.JSONDecodeError:
-                continue
+    # Validate
+    if 'id' not in uwb or 'range' not in uwb:
+        bridge_stats['udp_packets_invalid'] += 1
+        return None
 
-            # Validate
-            if 'id' not in uwb or 'range' not in uwb:
-                bridge_stats['udp_packets_invalid'] += 1
-                continue
+    tag_id = int(uwb['id'])
+    ranges = uwb['range']
 
-            tag_id = int(uwb['id'])
-            ranges = uwb['range']
+    if not isinstance(ranges, list) or len(ranges) < ANCHOR_COUNT:
+        bridge_stats['udp_packets_invalid'] += 1
+        return None
 
-            if not isinstance(ranges, list) or len(ranges) < ANCHOR_COUNT:
-                bridge_stats['udp_packets_invalid'] += 1
-                continue
+    if tag_id not in tags:
+        bridge_stats['udp_packets_invalid'] += 1
+        return None
 
-            if tag_id not in tags:
-                bridge_stats['udp_packets_invalid'] += 1
-                continue
+    rssi_list = uwb.get('rssi', [0]*len(ranges))
+    now = time.time()
 
-            rssi_list = uwb.get('rssi', [0]*len(ranges))
-            now = time.time()
+    # ── Position calculation ──────────────────────────
+    # Use only first ANCHOR_COUNT ranges (hardware sends 8, we use 4)
+    active_ranges = ranges[:ANCHOR_COUNT]
+    pos, quality, anc_count = Positioning.calculate(
+        active_ranges, rssi_list, anchors_info
+    )
 
-            # ── Position calculation ──────────────────────────
-            # Use only first ANCHOR_COUNT ranges (hardware sends 8, we use 4)
-            active_ranges = ranges[:ANCHOR_COUNT]
-            pos, quality, anc_count = Positioning.calculate(
-                active_ranges, rssi_list, anchors_info
-            )
+    if pos is None:
+        bridge_stats['udp_packets_invalid'] += 1
+        return None
 
-            if pos is None:
-                bridge_stats['udp_packets_invalid'] += 1
-                continue
+    bridge_stats['udp_packets_valid'] += 1
+    bridge_stats['tags_seen'].add(tag_id)
+    return (tag_id, pos[0], pos[1], quality, anc_count, active_ranges, now,
+            bridge_stats['udp_packets_total'] % 20 == 0)
+
+
+def filter_round(fixes):
+    """
+    Kalman-filter fixes for distinct tags: each tag's stationary gate runs
+    first, then every fix that passes is stepped in one BatchKalman.step.
+    """
+    ids, mx, my, dts, live = [], [], [], [], []
+    for tag_id, raw_x, raw_y, quality, anc_count, _, now, _ in fixes:
+        dt = tags[tag_id].gate(raw_x, raw_y, quality, anc_count, now)
+        if dt is None:
+            continue
+        ids.append(tag_id); mx.append(raw_x); my.append(raw_y); dts.append(dt)
+        live.append((tag_id, raw_x, raw_y, now))
+    if not ids:
+        return
+    for (tag_id, raw_x, raw_y, now), (x, y) in zip(live, batch_kf.step(ids, mx, my, dts).tolist()):
+        tags[tag_id].apply_fix(x, y, raw_x, raw_y, now)
+
+
+def split_rounds(fixes):
+    """Split a tick's fixes into rounds holding each tag at most once: a tag's n-th fix goes in round n."""
+    rounds, seen = [], {}
+    for fix in fixes:
+        n = seen.get(fix[0], 0)
+        seen[fix[0]] = n + 1
+        if n == len(rounds):
+            rounds.append([])
+        rounds[n].append(fix)
+    return rounds
+
+
+def finish_packet(fix):
+    """
+    Race logic and tag_position frame for one filtered fix.
+    Returns (tag_position frame or None, whether game events fired).
+    """
+    tag_id, raw_x, raw_y, quality, anc_count, active_ranges, now, log = fix
+    tag = tags[tag_id]
+
+    # ── Run race/collision logic ──────────────────────
+    game_events = process_race_update(tag_id, now)
+
+    # Periodic log
+    if log:
+        print(f"[UWB] Tag {tag_id}: ({tag.x:.0f},{tag.y:.0f})cm  "
+              f"qual={quality}  spd={tag.speed_display():.1f}{SPEED_DISPLAY_UNIT}  "
+              f"pkt#{bridge_stats['udp_packets_valid']}")
+
+    if not (connected_clients and event_loop):
+        return None, bool(game_events)
+
+    # Per-packet position message
+    return _dumps({
+        "type":      "tag_position",
+        "tag_id":    tag_id,
+        "x":         round(tag.x, 1),
+        "y":         round(tag.y, 1),
+        "raw_x":     round(raw_x, 1),
+        "raw_y":     round(raw_y, 1),
+        "range":     active_ranges,
+        "speed":     round(tag.speed_display(), 2),
+        "speed_cms": round(tag.speed_cms, 1),
+        "speed_unit": SPEED_DISPLAY_UNIT,
+        "quality":   quality,
+        "anchor_count": anc_count,
+        "timestamp": now,
+        "game_events": game_events,
+    }), bool(game_events)
+
+
+def udp_receiver():
+    global running
+    sock = create_udp_socket()
+    print(f"[UDP] ✓ Listening on port {UDP_PORT}")
 
-            raw_x, raw_y = pos
-
-            # ── Update tag state ─────────────────────────────
-            tag = tags[tag_id]
-            tag.update_position(raw_x, raw_y, quality, anc_count, now)
-
-            bridge_stats['udp_packets_valid'] += 1
-            bridge_stats['tags_seen'].add(tag_id)
-
-            # ── Run race/collision logic ──────────────────────
-            game_events = process_race_update(tag_id, now)
-
-            # ── Build and broadcast WebSocket message ─────────
-            if connected_clients and event_loop:
-                # Per-packet position message
-                pos_msg = json.dumps({
-                    "type":      "tag_position",
-                    "tag_id":    tag_id,
-                    "x":         round(tag.x, 1),
-                    "y":         round(tag.y, 1),
-                    "raw_x":     round(raw_x, 1),
-                    "raw_y":     round(raw_y, 1),
-                    "range":     active_ranges,
-                    "speed":     round(tag.speed_display(), 2),
-                    "speed_cms": round(tag.speed_cms, 1),
-                    "speed_unit": SPEED_DISPLAY_UNIT,
-                    "quality":   quality,
-                    "anchor_count": anc_count,
-                    "timestamp": now,
-                    "game_events": game_events,
-                })
-                asyncio.run_coroutine_threadsafe(
-                    broadcast(pos_msg), event_loop
-                )
-
-                # If there were lap/collision events, also send full state
-                if game_events:
-                    state_msg = build_state_message(now)
-                    asyncio.run_coroutine_threadsafe(
-                        broadcast(state_msg), event_loop
-                    )
-
-            # Periodic log
-            if pkt % 20 == 0:
-                print(f"[UWB] Tag {tag_id}: ({tag.x:.0f},{tag.y:.0f})cm  "
-                      f"qual={quality}  spd={tag.speed_display():.1f}{SPEED_DISPLAY_UNIT}  "
-                      f"pkt#{bridge_stats['udp_packets_valid']}")
-
-        except socket.timeout:
+    while running:
+        if not select.select([sock], [], [], 0.1)[0]:
             continue
-        except Exception as e:
-            if running:
-                print(f"[UDP] ✗ Error: {e}")
+
+        # One tick: everything already queued, up to TICK_MAX_PACKETS.
+        fixes = []
+        for _ in range(TICK_MAX_PACKETS):
+            try:
+                data, addr = sock.recvfrom(2048)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if running:
+                    print(f"[UDP] ✗ Error: {e}")
+                break
+            try:
+                fix = locate_packet(data)
+            except Exception as e:
+                if running:
+                    print(f"[UDP] ✗ Error: {e}")
+                continue
+            if fix:
+                fixes.append(fix)
+
+        # The tick's fixes are Kalman-filtered together, one batched step per
+        # round of distinct tags; each round's race logic runs before the next
+        # so a tag's fixes still reach the lap engine in order. Position frames
+        # go out together and all lap/collision events of the tick share a
+        # single state_update instead of one each.
+        frames, evented = [], False
+        for rnd in split_rounds(fixes):
+            try:
+                filter_round(rnd)
+            except Exception as e:
+                if running:
+                    print(f"[UDP] ✗ Error: {e}")
+                continue
+            for fix in rnd:
+                try:
+                    frame, had_events = finish_packet(fix)
+                except Exception as e:
+                    if running:
+                        print(f"[UDP] ✗ Error: {e}")
+                    continue
+                if frame:
+                    frames.append(frame)
+                evented = evented or had_events
+
+        if connected_clients and event_loop and (frames or evented):
+            if evented:
+                frames.append(build_state_message(time.time()))
+            event_loop.call_soon_threadsafe(broadcast, *frames)
 
     sock.close()
     print("[UDP] ✓ Receiver stopped")
@@ -1083,17 +1488,52 @@ def udp_receiver():
 # ═══════════════════════════════════════════════════════════════════════════
 # WEBSOCKET SERVER
 # ═══════════════════════════════════════════════════════════════════════════
-async def broadcast(message):
+class ClientConn:
+    """A browser socket plus its bounded outbound queue, drained by one writer task."""
+    def __init__(self, ws):
+        self.ws        = ws
+        self.out_queue = asyncio.Queue(maxsize=WS_QUEUE_MAX)
+        self.closing   = None
+
+    def push(self, message):
+        if self.closing:
+            return
+        try:
+            self.out_queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # slow client: dropping frames would lose lap/finish events, so
+            # disconnect it – the browser reconnects and gets a full snapshot
+            print(f"[WS] ⚠ Client {self.ws.remote_address} lagging – disconnecting")
+            self.close(1013)
+
+    def close(self, code):
+        """Unregister and close the socket (event loop thread only)."""
+        if self.closing:
+            return
+        connected_clients.discard(self)
+        self.closing = asyncio.create_task(self.ws.close(code))
+
+    async def writer(self):
+        q, ws = self.out_queue, self.ws
+        try:
+            while True:
+                await ws.send(await q.get())
+        except websockets.exceptions.ConnectionClosed:
+            pass   # handle_client sees the close and unregisters us
+        except Exception as e:
+            print(f"[WS] ✗ Send error: {e}")
+            self.close(1011)
+
+
+def broadcast(*messages):
+    """Queue messages, in order, for every client (event loop thread only)."""
     if not connected_clients:
         return
-    bridge_stats['ws_messages_sent'] += 1
-    dead = set()
-    for client in connected_clients:
-        try:
-            await client.send(message)
-        except Exception:
-            dead.add(client)
-    connected_clients.difference_update(dead)
+    bridge_stats['ws_messages_sent'] += len(messages)
+    # a lagging client unregisters itself mid-loop
+    for conn in tuple(connected_clients):
+        for message in messages:
+            conn.push(message)
 
 
 async def handle_client(websocket):
@@ -1102,14 +1542,16 @@ async def handle_client(websocket):
     client_id   = f"{client_addr[0]}:{client_addr[1]}"
     print(f"\n[WS] ✓ Client connected: {client_id}")
 
-    connected_clients.add(websocket)
+    conn   = ClientConn(websocket)
+    writer = asyncio.create_task(conn.writer())
+    connected_clients.add(conn)
     bridge_stats['ws_clients_total'] += 1
     print(f"[WS] Active clients: {len(connected_clients)}")
 
     try:
-        # Welcome message
+        # Welcome message (replies go through the queue too, keeping order)
         now = time.time()
-        await websocket.send(json.dumps({
+        conn.push(_dumps({
             "type":    "connection",
             "status":  "connected",
             "message": "Connected to UWB Full Racing System",
@@ -1134,7 +1576,7 @@ async def handle_client(websocket):
         }))
 
         # Send initial full state
-        await websocket.send(build_state_message(now))
+        conn.push(build_state_message(now))
 
         # Handle commands from client
         async for message in websocket:
@@ -1143,14 +1585,14 @@ async def handle_client(websocket):
                 msg_type = data.get('type')
 
                 if msg_type == 'ping':
-                    await websocket.send(json.dumps({
+                    conn.push(_dumps({
                         "type": "pong", "timestamp": time.time()
                     }))
 
                 elif msg_type == 'admin_start':
                     race_mgr.admin_start()
                     race_armed = True
-                    await broadcast(json.dumps({
+                    broadcast(_dumps({
                         "type": "admin_event",
                         "event": "race_armed",
                         "message": "Race armed – waiting for first crossing",
@@ -1164,7 +1606,7 @@ async def handle_client(websocket):
                     race_armed = False
                     for tag in tags.values():
                         tag.reset()
-                    await broadcast(json.dumps({
+                    broadcast(_dumps({
                         "type": "admin_event",
                         "event": "race_reset",
                         "message": "Race reset",
@@ -1174,7 +1616,7 @@ async def handle_client(websocket):
 
                 elif msg_type == 'get_stats':
                     uptime = (datetime.now() - bridge_stats['start_time']).total_seconds()
-                    await websocket.send(json.dumps({
+                    conn.push(_dumps({
                         "type":               "stats",
                         "udp_packets_total":  bridge_stats['udp_packets_total'],
                         "udp_packets_valid":  bridge_stats['udp_packets_valid'],
@@ -1189,7 +1631,7 @@ async def handle_client(websocket):
                     }))
 
                 elif msg_type == 'get_state':
-                    await websocket.send(build_state_message(time.time()))
+                    conn.push(build_state_message(time.time()))
 
                 else:
                     print(f"[WS] Unknown command '{msg_type}' from {client_id}")
@@ -1204,7 +1646,8 @@ async def handle_client(websocket):
     except Exception as e:
         print(f"[WS] ✗ Client error: {e}")
     finally:
-        connected_clients.discard(websocket)
+        connected_clients.discard(conn)
+        writer.cancel()
         print(f"[WS] ✗ Disconnected: {client_id} | Active: {len(connected_clients)}")
 
 
@@ -1287,7 +1730,8 @@ def signal_handler(sig, frame):
 if __name__ == "__main__":
     signal.signal(signal.SIGINT, signal_handler)
     try:
-        asyncio.run(main())
+        # libuv-backed loop for the websockets server when installed
+        (uvloop.run if uvloop else asyncio.run)(main())
     except KeyboardInterrupt:
         signal_handler(None, None)
     except Exception as e:
@@ -42,26 +42,48 @@
 #         await self.send(json.dumps(event["data"]))
 
 
-import json
+import asyncio
+import orjson
 from channels.generic.websocket import AsyncWebsocketConsumer
+from channels.db import database_sync_to_async
+from django.core.cache import cache
+
+# tag_update events are coalesced and flushed as one frame per period
+SEND_PERIOD_MS = 20
+
+
+_ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _dumps(content, _encode=orjson.dumps, _opts=_ORJSON_OPTS):
+    """orjson-encode for a text frame (C encoder; numpy values and int keys allowed)."""
+    return _encode(content, option=_opts).decode()
+
 
 class RaceTrackConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         await self.channel_layer.group_add("race_track", self.channel_name)
         await self.accept()
+
+        # latest packet per tag_id, drained by _flush_tags
+        self._latest = {}
+        self._flusher = asyncio.create_task(self._flush_tags())
         
         # Send confirmation
-        await self.send(json.dumps({
+        await self.send(_dumps({
             "type": "connection",
             "message": "Connected to race tracker"
         }))
 
     async def disconnect(self, close_code):
+        flusher = getattr(self, "_flusher", None)
+        if flusher:
+            flusher.cancel()
         await self.channel_layer.group_discard("race_track", self.channel_name)
 
     async def receive(self, text_data):
         try:
-            data = json.loads(text_data)
+            data = orjson.loads(text_data)
             msg_type = data.get("type")
 
             # ── 1. Intercept Screen Broadcasts from Admin ──
@@ -106,22 +128,35 @@ class RaceTrackConsumer(AsyncWebsocketConsumer):
     # ← THIS WAS MISSING — broadcast_screen view calls group_send with type "broadcast_message"
     # Django Channels maps "broadcast_message" → method "broadcast_message"
     async def broadcast_message(self, event):
-        await self.send(json.dumps({
+        await self.send(_dumps({
             "type": "screen_update",
             "data": event["data"]
         }))
 
     async def push_screen_update(self, event):
-        await self.send(json.dumps({
+        await self.send(_dumps({
             "type": "screen_update",
             "data": event["payload"]
         }))
 
     async def generic_echo(self, event):
-        await self.send(json.dumps(event["payload"]))
+        await self.send(_dumps(event["payload"]))
 
     async def tag_update(self, event):
-        await self.send(json.dumps(event["data"]))
+        # Keep only the newest pre-encoded packet per tag; _flush_tags sends them
+        self._latest.update(zip(event["ids"], event["texts"]))
+
+    async def _flush_tags(self):
+        period = SEND_PERIOD_MS / 1000
+        while True:
+            await asyncio.sleep(period)
+            if not self._latest:
+                continue
+            batch, self._latest = self._latest, {}
+            # packets arrive as JSON text from the UDP thread: splice them into
+            # the frame instead of re-encoding (still a text frame for JSON.parse)
+            await self.send(text_data='{"type":"tag_batch","tags":[%s]}'
+                            % ",".join(batch.values()))
 
 
 
@@ -148,12 +183,6 @@ class RaceTrackConsumer(AsyncWebsocketConsumer):
 
 
 
-import json
-from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
-from django.core.cache import cache
-
-
 class ScreenConsumer(AsyncWebsocketConsumer):
 
     async def connect(self):
@@ -170,7 +199,7 @@ class ScreenConsumer(AsyncWebsocketConsumer):
 
         if current_screen:
             # ✅ Send the screen they were viewing before the refresh
-            await self.send(json.dumps({
+            await self.send(_dumps({
                 "type": "screen_update",
                 "data": current_screen
             }))
@@ -182,7 +211,7 @@ class ScreenConsumer(AsyncWebsocketConsumer):
         )
 
     async def screen_update(self, event):
-        await self.send(json.dumps({
+        await self.send(_dumps({
             "type": "screen_update",
             "data": event["payload"]
         }))
\ No newline at end of file
@@ -1,62 +1,264 @@
 import socket
-import json
 import time
 import threading
 import asyncio
+import ctypes
+import errno
+import os
+import select
+import sys
+import orjson
+
+try:
+    import uvloop
+except ImportError:   # optional (not available on Windows)
+    uvloop = None
 
 _started = False  # flag so it only starts once
+_loop = None      # persistent event loop that runs the group_sends
+_queue = None     # bounded hand-off from the receive threads to _pump
+_QUEUE_MAX = 256
+
+UDP_PORT = 4210
+BUSY_POLL_US = 0    # >0: spin this many µs in the driver before sleeping
+RCVBUF_BYTES = 4 * 1024 * 1024   # socket queue for bursts (kernel caps at rmem_max)
+
+_GROUP = "race_track"
+_ENVELOPE_TYPE = "tag_update"
+_PAYLOAD_TYPE = "tag_position"
+_EMPTY = ()   # shared stand-in for a missing range/rssi list (encodes as [])
+
+
+# ── recvmmsg(2): many datagrams per kernel crossing (Linux) ──────────────────
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [("msg_name", ctypes.c_void_p), ("msg_namelen", ctypes.c_uint32),
+                ("msg_iov", ctypes.POINTER(_IOVec)), ("msg_iovlen", ctypes.c_size_t),
+                ("msg_control", ctypes.c_void_p), ("msg_controllen", ctypes.c_size_t),
+                ("msg_flags", ctypes.c_int)]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+def _load_recvmmsg():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        fn = ctypes.CDLL(None, use_errno=True).recvmmsg
+    except (OSError, AttributeError):
+        return None
+    fn.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint,
+                   ctypes.c_int, ctypes.c_void_p]
+    fn.restype = ctypes.c_int
+    return fn
+
+
+def _enable_busy_poll(sock, usecs):
+    """Opt-in NAPI busy polling on the socket (Linux; needs CAP_NET_ADMIN to raise)."""
+    SO_BUSY_POLL, SO_PREFER_BUSY_POLL = 46, 69
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, SO_BUSY_POLL, usecs)
+        sock.setsockopt(socket.SOL_SOCKET, SO_PREFER_BUSY_POLL, 1)
+    except OSError as e:
+        print(f"[UWB] busy poll not enabled: {e}")
+
+
+class _BatchReceiver:
+    """Waits for the socket, then drains up to `vlen` datagrams in one call.
+
+    Uses recvmmsg(2) with MSG_DONTWAIT where libc has it and falls back to a
+    single recv_into() per wake-up elsewhere. Datagrams land in one reused
+    bytearray; the returned memoryviews are only valid until the next recv().
+    On Linux readiness comes from an edge-triggered epoll: after a wake-up the
+    socket is drained without polling again until a read comes back short.
+    """
+    MSG_DONTWAIT = 0x40
+
+    def __init__(self, sock, vlen=32, bufsize=2048):
+        self.sock = sock
+        self.vlen = vlen
+        self.bufsize = bufsize
+        self._rx = bytearray(vlen * bufsize)
+        self._view = memoryview(self._rx)
+        self._ep = None
+        self._ready = False   # edge-triggered: socket may still hold datagrams
+        if hasattr(select, "epoll"):
+            self._ep = select.epoll()
+            self._ep.register(sock.fileno(), select.EPOLLIN | select.EPOLLET)
+        self._recvmmsg = _load_recvmmsg()
+        if self._recvmmsg is None:
+            return
+        # ctypes alias of the bytearray (kept alive: it pins the buffer)
+        self._rx_c = (ctypes.c_char * len(self._rx)).from_buffer(self._rx)
+        base = ctypes.addressof(self._rx_c)
+        self._iov = (_IOVec * vlen)()
+        self._msgs = (_MMsgHdr * vlen)()
+        for i in range(vlen):
+            self._iov[i].iov_base = base + i * bufsize
+            self._iov[i].iov_len = bufsize
+            hdr = self._msgs[i].msg_hdr
+            hdr.msg_iov = ctypes.cast(ctypes.addressof(self._iov[i]), ctypes.POINTER(_IOVec))
+            hdr.msg_iovlen = 1
+
+    def _wait(self, timeout):
+        if self._ep is None:
+            return bool(select.select([self.sock], [], [], timeout)[0])
+        if not self._ready:
+            self._ready = bool(self._ep.poll(timeout))
+        return self._ready
+
+    def recv(self, timeout):
+        """Datagrams that arrived within `timeout` seconds (possibly none)."""
+        if not self._wait(timeout):
+            return []
+        if self._recvmmsg is None:
+            try:
+                n = self.sock.recv_into(self._rx, self.bufsize)
+            except BlockingIOError:
+                self._ready = False
+                return []
+            return [self._view[:n]]
+        n = self._recvmmsg(self.sock.fileno(), self._msgs, self.vlen, self.MSG_DONTWAIT, None)
+        if n < 0:
+            err = ctypes.get_errno()
+            if err in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR):
+                self._ready = False
+                return []
+            raise OSError(err, os.strerror(err))
+        if n < self.vlen:
+            self._ready = False   # short read: queue drained, wait for the next edge
+        view, msgs, size = self._view, self._msgs, self.bufsize
+        return [view[i * size:i * size + msgs[i].msg_len] for i in range(n)]
+
+
+def _open_socket(reuseport):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuseport:
+        # kernel hashes incoming datagrams across every socket on the port
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RCVBUF_BYTES)
+    except OSError:
+        pass
+    sock.bind(('', UDP_PORT))
+    sock.setblocking(False)
+    if BUSY_POLL_US and sys.platform.startswith("linux"):
+        _enable_busy_poll(sock, BUSY_POLL_US)
+    return sock
 
 
 def start_udp_listener():
-    global _started
+    global _started, _loop, _queue
     if _started:
         return
     _started = True
 
-    thread = threading.Thread(target=_run, daemon=True)
-    thread.start()
-    print("[UWB] UDP listener started on port 4210")
+    from channels.layers import get_channel_layer
 
+    # group_sends are handed to this loop instead of re-entering one per packet
+    # (uvloop when installed; only this loop, the server's policy is untouched)
+    _loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+    _queue = asyncio.Queue(maxsize=_QUEUE_MAX)
+    threading.Thread(target=_loop.run_forever, daemon=True).start()
+    asyncio.run_coroutine_threadsafe(_pump(get_channel_layer().group_send), _loop)
 
-def _run():
-    from channels.layers import get_channel_layer
+    # one receive thread per SO_REUSEPORT socket where the platform has it
+    reuseport = hasattr(socket, "SO_REUSEPORT")
+    n = max(1, (os.cpu_count() or 2) // 2) if reuseport else 1
+    for _ in range(n):
+        thread = threading.Thread(target=_run, args=(_open_socket(reuseport),), daemon=True)
+        thread.start()
+    print(f"[UWB] UDP listener started on port {UDP_PORT} ({n} receive threads)")
 
-    UDP_PORT = 4210
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    sock.bind(('', UDP_PORT))
-    sock.settimeout(1.0)
 
-    channel_layer = get_channel_layer()
-    loop = asyncio.new_event_loop()
+def _enqueue(message):
+    # loop thread: never block the receivers — drop the oldest batch when full
+    # (positions are time-valued, a fresh one supersedes a stale one)
+    if _queue.full():
+        _queue.get_nowait()
+    _queue.put_nowait(message)
+
 
+async def _pump(group_send):
     while True:
+        message = await _queue.get()
         try:
-            data, addr = sock.recvfrom(2048)
-            message = json.loads(data.decode('utf-8').strip())
-
-            # message from UWB tag:
-            # { "id": 0, "range": [100, 200, 150, 180], "rssi": [-60, -70, -65, -72] }
-
-            payload = {
-                "type": "tag_position",
-                "tag_id": str(message["id"]),
-                "range": message.get("range", []),
-                "rssi": message.get("rssi", []),
-                "timestamp": time.time(),
-            }
-
-            # push to ALL connected websockets — browser filters by active tag_ids
-            loop.run_until_complete(
-                channel_layer.group_send("race_track", {
-                    "type": "tag_update",
-                    "data": payload,
-                })
-            )
-
-        except socket.timeout:
-            continue
-        except json.JSONDecodeError:
-            continue
+            await group_send(_GROUP, message)
         except Exception as e:
-            print(f"[UWB] Error: {e}")
\ No newline at end of file
+            print(f"[UWB] Error: {e}")
+
+
+def _push(ids, texts):
+    # push to ALL connected websockets — browser filters by active tag_ids
+    _loop.call_soon_threadsafe(
+        _enqueue, {"type": _ENVELOPE_TYPE, "ids": ids, "texts": texts})
+
+
+def _run(sock):
+    BATCH_WINDOW = 0.005   # seconds a packet may wait for company
+    BATCH_MAX = 32         # flush early once this many packets are queued
+
+    receiver = _BatchReceiver(sock)
+
+    # bound once: the loop below runs per datagram
+    loads = orjson.loads
+    dumps = orjson.dumps
+    decode_error = orjson.JSONDecodeError
+    wall_clock_ns = time.time_ns
+    monotonic = time.monotonic
+    payload_type, empty = _PAYLOAD_TYPE, _EMPTY
+    # batch: tag ids + their payloads already encoded as JSON text, so
+    # consumers forward them without re-encoding per client
+    batch_ids, batch_texts = [], []
+    deadline = 0.0
+
+    while True:
+        try:
+            datagrams = receiver.recv(0.002)
+        except Exception as e:
+            print(f"[UWB] Error: {e}")
+            datagrams = ()
+
+        for data in datagrams:
+            # cheap reject before parsing: tag packets are JSON objects
+            if not data or data[0] != 0x7B:   # b"{"
+                continue
+            try:
+                # orjson parses the receive buffer in place (surrounding
+                # whitespace is valid JSON)
+                message = loads(data)
+
+                # message from UWB tag:
+                # { "id": 0, "range": [100, 200, 150, 180], "rssi": [-60, -70, -65, -72] }
+
+                get = message.get
+                tag_id = message["id"]   # sent as-is (int from the firmware)
+                text = dumps({
+                    "type": payload_type,
+                    "tag_id": tag_id,
+                    "range": get("range", empty),
+                    "rssi": get("rssi", empty),
+                    "timestamp": wall_clock_ns() // 1_000_000,   # epoch ms (int)
+                }).decode()
+            except decode_error:
+                continue
+            except Exception as e:
+                print(f"[UWB] Error: {e}")
+                continue
+
+            if not batch_ids:
+                deadline = monotonic() + BATCH_WINDOW
+            batch_ids.append(tag_id)
+            batch_texts.append(text)
+
+        # Coalesce a few ms of packets into one group_send
+        if batch_ids and (len(batch_ids) >= BATCH_MAX or monotonic() >= deadline):
+            _push(batch_ids, batch_texts)
+            batch_ids, batch_texts = [], []